@@ -3,18 +3,81 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field
+from typing import Callable, Deque, Dict, Mapping, Any, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, field
+from collections import OrderedDict, deque
+from itertools import islice
 import logging
+import sys
+import time
 from datetime import datetime
+from types import MappingProxyType
 
 
-class AgentMessage(BaseModel):
-    """Модель для сообщений между агентами."""
-    role: str = Field(description="Роль отправителя")
-    content: str = Field(description="Содержание сообщения")
-    timestamp: datetime = Field(default_factory=datetime.now)
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+# Интернированные ключи метаданных сообщений
+_FROM = sys.intern("from")
+_TO = sys.intern("to")
+
+
+@dataclass(frozen=True, slots=True, init=False)
+class AgentMessage:
+    """
+    Сообщение между агентами (внутрипроцессное, без валидации).
+    
+    Неизменяемо: отправитель и получатель хранят ссылку на один и тот же объект.
+    """
+    role: str  # Роль отправителя
+    content: str  # Содержание сообщения
+    timestamp: int  # Время создания, нс с эпохи
+    meta: Tuple[Tuple[str, Any], ...]  # Метаданные в виде пар (ключ, значение)
+    _metadata_view: Optional[Mapping[str, Any]] = field(repr=False, compare=False)
+    
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        timestamp: Optional[int] = None,
+        meta: Tuple[Tuple[str, Any], ...] = (),
+        metadata: Optional[Mapping[str, Any]] = None
+    ):
+        """
+        Создание сообщения.
+        
+        Args:
+            role: Роль отправителя
+            content: Содержание сообщения
+            timestamp: Время создания, нс с эпохи (по умолчанию - текущее)
+            meta: Метаданные в виде пар (ключ, значение)
+            metadata: Метаданные словарем, как в прежнем API (добавляются после meta)
+        """
+        if metadata:
+            meta = tuple(meta) + tuple(metadata.items())
+        object.__setattr__(self, "role", role)
+        object.__setattr__(self, "content", content)
+        object.__setattr__(self, "timestamp", time.time_ns() if timestamp is None else timestamp)
+        object.__setattr__(self, "meta", meta)
+        object.__setattr__(self, "_metadata_view", None)
+    
+    @property
+    def timestamp_dt(self) -> datetime:
+        """Время создания сообщения в виде datetime."""
+        return datetime.fromtimestamp(self.timestamp / 1e9)
+    
+    @property
+    def metadata(self) -> Mapping[str, Any]:
+        """Метаданные в виде словаря только для чтения (строится при первом обращении)."""
+        if self._metadata_view is None:
+            object.__setattr__(self, "_metadata_view", MappingProxyType(dict(self.meta)))
+        return self._metadata_view
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Сериализация сообщения (для сохранения в JSON)."""
+        return {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp_dt.isoformat(),
+            "metadata": dict(self.metadata)
+        }
 
 
 class BaseAgent(ABC):
@@ -23,6 +86,32 @@ class BaseAgent(ABC):
     Каждый агент должен уметь "мыслить" и "отвечать".
     """
     
+    __slots__ = (
+        "name", "role", "model", "temperature", "max_tokens",
+        "internal_thoughts", "_thoughts_buf", "_thoughts_pending",
+        "_last_stamp_second", "_last_stamp", "_thoughts_joined", "_name_prefix",
+        "message_history", "logger", "interview_context",
+        "_status_cache", "_status_dirty", "prefix_cache", "_edge_meta"
+    )
+    
+    # Максимальное количество записей в кэше результатов (LRU)
+    PREFIX_CACHE_SIZE: int = 256
+    
+    # Максимальное количество получателей с заранее собранными метаданными
+    EDGE_CACHE_SIZE: int = 64
+    
+    # Атрибуты экземпляра (объявлены на уровне класса для статической типизации)
+    name: str
+    role: str
+    model: Optional[str]
+    temperature: float
+    max_tokens: int
+    internal_thoughts: Deque[Tuple[float, Union[str, Callable[[], str]]]]
+    message_history: Deque[AgentMessage]
+    logger: logging.Logger
+    interview_context: Dict[str, Any]
+    prefix_cache: "OrderedDict[str, Any]"
+    
     def __init__(
         self,
         name: str,
@@ -30,6 +119,7 @@ class BaseAgent(ABC):
         model: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 1000,
+        max_history: int = 4096,
         **kwargs
     ):
         """
@@ -41,6 +131,7 @@ class BaseAgent(ABC):
             model: Модель LLM для использования
             temperature: Креативность модели (0-1)
             max_tokens: Максимальное количество токенов в ответе
+            max_history: Максимальное количество хранимых мыслей и сообщений
         """
         self.name = name
         self.role = role
@@ -48,19 +139,41 @@ class BaseAgent(ABC):
         self.temperature = temperature
         self.max_tokens = max_tokens
         
-        # История внутренних мыслей агента
-        self.internal_thoughts: List[str] = []
+        # История внутренних мыслей агента: (время, мысль), форматируется при чтении
+        self.internal_thoughts = deque(maxlen=max_history)
+        
+        # Уже отформатированные мысли и число еще не отформатированных
+        self._thoughts_buf: Deque[str] = deque(maxlen=max_history)
+        self._thoughts_pending: int = 0
+        self._last_stamp_second: Optional[int] = None
+        self._last_stamp: str = ""
+        
+        # Склеенная строка мыслей (None - нужно пересобрать)
+        self._thoughts_joined: Optional[str] = None
+        
+        # Неизменная часть отформатированной мысли
+        self._name_prefix = f"] {name}: "
         
         # История сообщений
-        self.message_history: List[AgentMessage] = []
+        self.message_history = deque(maxlen=max_history)
         
         # Логгер
         self.logger = logging.getLogger(f"agent.{name}")
         
         # Контекст интервью
-        self.interview_context: Dict[str, Any] = {}
+        self.interview_context = {}
+        
+        # Кэш статуса агента, пересобирается только после изменений
+        self._status_cache: Dict[str, Any] = {"name": name, "role": role}
+        self._status_dirty: bool = True
         
-        self.logger.info(f"Агент {name} ({role}) инициализирован")
+        # LRU-кэш результатов запросов к LLM по хэшу промпта (анализы Observer)
+        self.prefix_cache = OrderedDict()
+        
+        # Базовые метаданные сообщений по имени получателя
+        self._edge_meta: Dict[str, Tuple[Tuple[str, Any], ...]] = {}
+        
+        self.logger.info("Агент %s (%s) инициализирован", name, role)
     
     def set_interview_context(self, context: Dict[str, Any]) -> None:
         """
@@ -76,14 +189,16 @@ class BaseAgent(ABC):
                     }
         """
         self.interview_context = context
-        self.logger.debug(f"Контекст установлен для {self.name}: {context}")
+        self._status_dirty = True
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Контекст установлен для %s: %s", self.name, context)
     
     @abstractmethod
     async def think(
         self, 
         user_input: str, 
         context: Dict[str, Any],
-        conversation_history: List[Dict[str, str]]
+        conversation_history: Sequence[Dict[str, str]]
     ) -> Dict[str, Any]:
         """
         Внутренний процесс "мышления" агента.
@@ -110,7 +225,7 @@ class BaseAgent(ABC):
         self, 
         user_input: str, 
         context: Dict[str, Any],
-        conversation_history: List[Dict[str, str]]
+        conversation_history: Sequence[Dict[str, str]]
     ) -> str:
         """
         Генерация ответа пользователю.
@@ -125,17 +240,36 @@ class BaseAgent(ABC):
         """
         pass
     
-    def add_internal_thought(self, thought: str) -> None:
+    def add_internal_thought(self, thought: Union[str, Callable[[], str]]) -> None:
         """
         Добавление внутренней мысли в историю.
         
         Args:
-            thought: Внутренняя мысль агента
+            thought: Внутренняя мысль агента или функция без аргументов, которая
+                ее строит (вызывается только при чтении мыслей или отладочном логе)
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_thought = f"[{timestamp}] {self.name}: {thought}"
-        self.internal_thoughts.append(formatted_thought)
-        self.logger.debug(f"Внутренняя мысль {self.name}: {thought}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            if callable(thought):
+                thought = thought()
+            self.logger.debug("Внутренняя мысль %s: %s", self.name, thought)
+        self.internal_thoughts.append((time.time(), thought))
+        self._thoughts_pending += 1
+        self._thoughts_joined = None
+        self._status_dirty = True
+    
+    def _prefix_cache_get(self, key: str) -> Optional[Any]:
+        """Получение состояния из кэша префиксов с обновлением LRU-порядка."""
+        value = self.prefix_cache.get(key)
+        if value is not None:
+            self.prefix_cache.move_to_end(key)
+        return value
+    
+    def _prefix_cache_put(self, key: str, value: Any) -> None:
+        """Сохранение состояния в кэш префиксов с вытеснением старых записей."""
+        self.prefix_cache[key] = value
+        self.prefix_cache.move_to_end(key)
+        while len(self.prefix_cache) > self.PREFIX_CACHE_SIZE:
+            self.prefix_cache.popitem(last=False)
     
     def get_internal_thoughts(self) -> str:
         """
@@ -144,7 +278,42 @@ class BaseAgent(ABC):
         Returns:
             Строка с внутренними мыслями
         """
-        return "\n".join(self.internal_thoughts)
+        if self._thoughts_joined is None:
+            # Форматируем только мысли, добавленные после прошлого чтения
+            total = len(self.internal_thoughts)
+            pending = min(self._thoughts_pending, total)
+            for ts, thought in islice(self.internal_thoughts, total - pending, None):
+                # Время форматируется один раз на секунду, а не на каждую мысль
+                second = int(ts)
+                if second != self._last_stamp_second:
+                    self._last_stamp = "[" + time.strftime("%H:%M:%S", time.localtime(second))
+                    self._last_stamp_second = second
+                if callable(thought):
+                    thought = thought()
+                self._thoughts_buf.append(self._last_stamp + self._name_prefix + thought)
+            self._thoughts_pending = 0
+            self._thoughts_joined = "\n".join(self._thoughts_buf)
+        return self._thoughts_joined
+    
+    def _edge(self, to_name: str) -> Tuple[Tuple[str, Any], ...]:
+        """
+        Базовые метаданные для пары (отправитель, получатель).
+        
+        Собираются при первом сообщении получателю и затем переиспользуются.
+        
+        Args:
+            to_name: Имя агента-получателя
+            
+        Returns:
+            Кортеж пар ("from", ...), ("to", ...)
+        """
+        base_meta = self._edge_meta.get(to_name)
+        if base_meta is None:
+            if len(self._edge_meta) >= self.EDGE_CACHE_SIZE:
+                self._edge_meta.clear()
+            base_meta = ((_FROM, self.name), (_TO, to_name))
+            self._edge_meta[to_name] = base_meta
+        return base_meta
     
     def send_message(self, to_agent: 'BaseAgent', message: str, metadata: Dict = None) -> None:
         """
@@ -155,23 +324,17 @@ class BaseAgent(ABC):
             message: Текст сообщения
             metadata: Дополнительные метаданные
         """
-        if metadata is None:
-            metadata = {}
-        
-        agent_message = AgentMessage(
-            role=self.role,
-            content=message,
-            metadata={
-                "from": self.name,
-                "to": to_agent.name,
-                **metadata
-            }
-        )
+        meta = self._edge(to_agent.name)
+        if metadata:
+            meta += tuple(metadata.items())
+        agent_message = AgentMessage(role=self.role, content=message, meta=meta)
         
         self.message_history.append(agent_message)
+        self._status_dirty = True
         to_agent.receive_message(agent_message)
         
-        self.logger.debug(f"Сообщение от {self.name} к {to_agent.name}: {message[:50]}...")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Сообщение от %s к %s: %.50s...", self.name, to_agent.name, message)
     
     def receive_message(self, message: AgentMessage) -> None:
         """
@@ -181,14 +344,24 @@ class BaseAgent(ABC):
             message: Сообщение от агента
         """
         self.message_history.append(message)
-        self.logger.debug(f"Сообщение для {self.name} от {message.metadata.get('from')}: {message.content[:50]}...")
+        self._status_dirty = True
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Сообщение для %s от %s: %.50s...",
+                self.name, message.metadata.get("from"), message.content
+            )
     
     def clear_memory(self) -> None:
         """Очистка памяти агента (для новой сессии)."""
-        self.internal_thoughts = []
-        self.message_history = []
+        self.internal_thoughts.clear()
+        self._thoughts_buf.clear()
+        self._thoughts_pending = 0
+        self._thoughts_joined = None
+        self.message_history.clear()
         self.interview_context = {}
-        self.logger.info(f"Память агента {self.name} очищена")
+        self.prefix_cache.clear()
+        self._status_dirty = True
+        self.logger.info("Память агента %s очищена", self.name)
     
     def get_status(self) -> Dict[str, Any]:
         """
@@ -197,13 +370,13 @@ class BaseAgent(ABC):
         Returns:
             Словарь со статусом агента
         """
-        return {
-            "name": self.name,
-            "role": self.role,
-            "thoughts_count": len(self.internal_thoughts),
-            "messages_count": len(self.message_history),
-            "has_context": bool(self.interview_context)
-        }
+        if self._status_dirty:
+            status = self._status_cache
+            status["thoughts_count"] = len(self.internal_thoughts)
+            status["messages_count"] = len(self.message_history)
+            status["has_context"] = bool(self.interview_context)
+            self._status_dirty = False
+        return dict(self._status_cache)
     
     def __str__(self) -> str:
         return f"Agent(name={self.name}, role={self.role})"
@@ -4,7 +4,10 @@
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+import os
+import re
+from typing import Dict, Any, List, Optional, Sequence, Set
+from weakref import WeakKeyDictionary
 import logging
 from ..core.llm_client import MistralClientFactory
 from .base_agent import BaseAgent
@@ -18,6 +21,149 @@ from config.prompts import (
 
 logger = logging.getLogger(__name__)
 
+# Максимальное число одновременных запросов интервьюеров к LLM
+MAX_INFLIGHT = int(os.getenv("INTERVIEWER_MAX_INFLIGHT", "16"))
+
+# Семафор привязан к event loop, поэтому храним по одному на каждый loop
+_llm_semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+
+def _trunc(text: str, limit: int) -> str:
+    """Обрезка строки до limit символов без копирования коротких строк."""
+    return text if len(text) <= limit else text[:limit]
+
+
+def _llm_semaphore() -> asyncio.Semaphore:
+    """Семафор, ограничивающий одновременные запросы к LLM в текущем event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_INFLIGHT)
+        _llm_semaphores[loop] = semaphore
+    return semaphore
+
+
+# Вступления, которые модель добавляет перед вопросом
+# (применяются по очереди: следующий шаблон видит строку без предыдущих вступлений)
+_PATTERNS_TO_REMOVE = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'Отлично[,\s]+учитывая.*?предлагаю следующий вопрос:',
+    r'На основе.*?рекомендации.*?следующий вопрос:',
+    r'Учитывая.*?качество.*?ответа.*?вопрос:',
+    r'Следующий вопрос:',
+    r'Давайте перейдем к следующему вопросу:',
+    r'Теперь.*?вопрос:',
+    r'^.*?[,\s]+предлагаю.*?:'
+))
+
+# Технические артефакты в ответах модели
+_RE_BRACKET = re.compile(r'\[.*?\]')
+_RE_STAR = re.compile(r'\*.*?\*')
+_RE_UNDERSCORE = re.compile(r'_.*?_')
+_RE_MARKER = re.compile(r'^[-=]+$', re.MULTILINE)
+
+# Темы оффтопика: (имя группы, тема, ключевые слова)
+_OFFTOPIC_TOPICS = (
+    ("salary", "зарплата", ("зарплат", "оплат", "доход", "заработн")),
+    ("vacation", "отпуск", ("отпуск", "отпуска", "каникул")),
+    ("office", "офис", ("офис", "удаленк", "удалёнк", "рабочее место")),
+    ("team", "команда", ("команд", "коллектив", "сотрудник")),
+    ("schedule", "график", ("график", "расписан", "режим работы")),
+    ("education", "обучение", ("обучен", "курс", "тренинг", "образован"))
+)
+
+# Имена групп в регулярных выражениях должны быть ASCII - храним соответствие отдельно
+_GROUP_TO_TOPIC = {group: topic for group, topic, _ in _OFFTOPIC_TOPICS}
+_TOPIC_RE = re.compile(
+    "|".join(
+        f"(?P<{group}>{'|'.join(map(re.escape, keywords))})"
+        for group, _, keywords in _OFFTOPIC_TOPICS
+    ),
+    re.IGNORECASE
+)
+
+# Признаки ответа, которые могут прийти в контексте think() готовыми
+_PROVIDED_SIGNALS = ("is_offtopic", "is_counter_question", "answer_quality")
+
+# Поля истории вопросов и ответов
+_QA_COLUMNS = ("question", "answer", "topic", "difficulty", "quality", "question_number")
+
+# Переходы между уровнями сложности
+_DIFF_UP = {"junior": "middle", "middle": "senior", "senior": "senior"}
+_DIFF_DOWN = {"senior": "middle", "middle": "junior", "junior": "junior"}
+
+# Темы для упрощения и усложнения вопросов, технологии по умолчанию
+_SIMPLE_TOPICS = ("основы программирования", "базовые концепции", "фундаментальные знания")
+_COMPLEX_TOPICS = ("архитектура систем", "оптимизация производительности", "масштабирование")
+_DEFAULT_TECHS = ("Python", "базы данных", "алгоритмы")
+
+# Ключевые слова оффтопика для полной проверки
+_OFFTOPIC_KEYWORDS = ("погода", "отпуск", "зарплата", "офис", "удаленка", "команда", "начальник")
+
+# Любое слово, при котором ответ может оказаться оффтопиком (для быстрой проверки).
+# Ищется по тексту в нижнем регистре: str.lower() и поиск без IGNORECASE
+# заметно быстрее регистронезависимого сравнения каждого символа
+_RE_OFFTOPIC_HINT = re.compile(
+    "|".join(map(re.escape, _OFFTOPIC_KEYWORDS + tuple(
+        keyword for _, _, keywords in _OFFTOPIC_TOPICS for keyword in keywords
+    )))
+)
+
+# Ключевые слова эвристик (в нижнем регистре), каждая группа - один проход по тексту
+_RE_OFFTOPIC = re.compile("|".join(map(re.escape, _OFFTOPIC_KEYWORDS)))
+_RE_QUESTION_WORD = re.compile("почему|как|что|когда|где|зачем")
+
+# Категории оценки качества ответа: у каждого слова свой бит в маске
+_MEANINGLESS_PATTERNS = (
+    "тыкаю", "не знаю", "хз", "как бы", "типа", "ну", "эээ",
+    "ага", "угу", "да нет", "наверное", "может быть",
+    "я не уверен", "скорее всего", "вроде как"
+)
+_EVASIVE_PATTERNS = ("не помню", "забыл")
+_STRUCTURE_PATTERNS = ("потому что", "например", "во-первых", "таким образом", "следовательно")
+
+_QUALITY_PATTERNS = _MEANINGLESS_PATTERNS + _EVASIVE_PATTERNS + _STRUCTURE_PATTERNS
+_MASK_MEANINGLESS = (1 << len(_MEANINGLESS_PATTERNS)) - 1
+_MASK_EVASIVE = ((1 << len(_EVASIVE_PATTERNS)) - 1) << len(_MEANINGLESS_PATTERNS)
+_MASK_STRUCTURE = ((1 << len(_STRUCTURE_PATTERNS)) - 1) << (len(_MEANINGLESS_PATTERNS) + len(_EVASIVE_PATTERNS))
+# Биты найденного слова и всех слов, являющихся его префиксом (они начинаются в той же позиции)
+_QUALITY_BITS = {
+    pattern: sum(1 << bit for bit, other in enumerate(_QUALITY_PATTERNS) if pattern.startswith(other))
+    for pattern in _QUALITY_PATTERNS
+}
+# Один проход по ответу: просмотр вперед находит все вхождения, включая перекрывающиеся
+_RE_QUALITY_SCAN = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(_QUALITY_PATTERNS, key=len, reverse=True))) + "))"
+)
+
+# Вопросительное слово в начале ответа
+_RE_QUESTION_START = re.compile(
+    r'\s*(?:что|как|почему|где|когда|зачем|можно ли|а вы|а вам)\b',
+    re.IGNORECASE
+)
+
+# Последовательности пробельных символов
+_RE_WS = re.compile(r'\s+')
+
+# Строки-инструкции, которые не должны попадать в вопрос
+_RE_SKIP_LINE = re.compile(
+    r'дополнительные аспекты'
+    r'|если кандидат не затронет'
+    r'|рассмотрите следующие аспекты'
+    r'|пример хорошего вопроса'
+    r'|формат вопроса'
+    r'|сгенерируй вопрос',
+    re.IGNORECASE
+)
+
+# Строки целиком: разделители (---, ===) и инструкции
+_RE_DROP_LINE = re.compile(
+    r'^[^\S\n]*(?:---|===).*$|^.*(?:' + _RE_SKIP_LINE.pattern + r').*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Нумерация (1., 2.) и затем маркер списка (-, *) в начале каждой строки
+_RE_LINE_PREFIX = re.compile(r'^[^\S\n]*(?:\d+\.[^\S\n]*)?(?:[-*][^\S\n]*)?', re.MULTILINE)
+
 
 class InterviewerAgent(BaseAgent):
     """Агент-интервьюер для проведения технического интервью."""
@@ -48,10 +194,15 @@ class InterviewerAgent(BaseAgent):
         self.current_topic: Optional[str] = None
         self.current_difficulty: str = "junior"  # junior, middle, senior
         self.question_count: int = 0
+        # Темы заданных вопросов в порядке появления (пополняется в _qa_append)
         self.topics_covered: List[str] = []
+        self._topics_seen: Set[str] = set()
+        
+        # Память о вопросах и ответах: по списку на каждое поле (i-й элемент - i-й вопрос)
+        self.qa_history: Dict[str, List[Any]] = {column: [] for column in _QA_COLUMNS}
         
-        # Память о вопросах и ответах
-        self.qa_history: List[Dict[str, Any]] = []
+        # Отформатированные системные промпты (параметры позиции постоянны в течение сессии)
+        self._sys_prompt_cache: Dict[tuple, str] = {}
         
         logger.info(f"Агент Interviewer '{name}' инициализирован")
 
@@ -59,36 +210,45 @@ class InterviewerAgent(BaseAgent):
         self, 
         user_input: str, 
         context: Dict[str, Any],
-        conversation_history: List[Dict[str, str]]
+        conversation_history: Sequence[Dict[str, str]]
     ) -> Dict[str, Any]:
         """
         Интервьюер анализирует ответ кандидата.
         Теперь использует рекомендацию Observer для принятия решения.
+        
+        Если в context уже переданы признаки "is_offtopic", "is_counter_question"
+        и "answer_quality" (например, от Observer), они используются как есть
+        и соответствующие проверки не выполняются.
         """
         
-        self.add_internal_thought(f"Анализирую ответ кандидата: '{user_input[:100]}...'")
+        self.add_internal_thought(lambda: f"Анализирую ответ кандидата: '{_trunc(user_input, 100)}...'")
         
         # Получаем рекомендацию от Observer
         observer_recommendation = context.get("observer_recommendation", "")
         is_bad_answer = context.get("is_bad_answer", False)
-        
-        # Определяем, является ли ответ оффтопиком
-        is_offtopic = await self._detect_offtopic(user_input, context)
-        
-        # Определяем, является ли ответ встречным вопросом
-        is_counter_question = await self._detect_counter_question(user_input)
-        
-        # Определяем качество ответа
-        if "answer_quality" in context:
-            answer_quality = context["answer_quality"]
+        rec_lower = observer_recommendation.lower()
+        has_simplify = "упростить" in rec_lower
+        has_escalate = "усложнить" in rec_lower
+        
+        # Оффтопик, встречный вопрос и качество ответа - за один проход,
+        # если хотя бы один признак не передан в контексте
+        if all(key in context for key in _PROVIDED_SIGNALS):
+            classification = {}
         else:
-            answer_quality = await self._evaluate_answer_quality(user_input, context)
+            classification = self._classify_turn(user_input, context)
+        
+        is_offtopic = context["is_offtopic"] if "is_offtopic" in context else classification["offtopic"]
+        is_counter_question = (
+            context["is_counter_question"] if "is_counter_question" in context
+            else classification["counter_question"]
+        )
+        answer_quality = context["answer_quality"] if "answer_quality" in context else classification["quality"]
         
         # Корректируем оценку на основе рекомендации Observer
-        if "упростить" in observer_recommendation.lower() or is_bad_answer:
+        if has_simplify or is_bad_answer:
             answer_quality = max(1, answer_quality - 3)
         
-        if "усложнить" in observer_recommendation.lower():
+        if has_escalate:
             answer_quality = min(10, answer_quality + 2)
         
         # Генерируем мысли для лога
@@ -110,9 +270,9 @@ class InterviewerAgent(BaseAgent):
             action = "handle_offtopic"
         elif is_counter_question:
             action = "handle_counter_question"
-        elif answer_quality < 3 or "упростить" in observer_recommendation.lower():
+        elif answer_quality < 3 or has_simplify:
             action = "simplify_question"
-        elif answer_quality > 7 and "усложнить" in observer_recommendation.lower():
+        elif answer_quality > 7 and has_escalate:
             action = "escalate_difficulty"
         else:
             action = "continue_topic"
@@ -195,7 +355,7 @@ class InterviewerAgent(BaseAgent):
         self, 
         user_input: str, 
         context: Dict[str, Any],
-        conversation_history: List[Dict[str, str]]
+        conversation_history: Sequence[Dict[str, str]]
     ) -> str:
         """
         Генерация ответа интервьюера.
@@ -203,78 +363,66 @@ class InterviewerAgent(BaseAgent):
         
         # Получаем результат анализа
         answer_quality = context.get("answer_quality", 5)
-        observer_recommendation = context.get("observer_recommendation", "")
-        is_good_answer = context.get("is_good_answer", answer_quality >= 6)
+        rec_lower = context.get("observer_recommendation", "").lower()
         
         # Определяем действие на основе оценки качества
-        if answer_quality < 4 or "упростить" in observer_recommendation.lower():
+        if answer_quality < 4 or "упростить" in rec_lower:
             action = "simplify_question"
-        elif answer_quality > 7 and "усложнить" in observer_recommendation.lower():
+        elif answer_quality > 7 and "усложнить" in rec_lower:
             action = "escalate_difficulty"
         else:
             action = "continue_topic"
         
         # Сохраняем вопрос-ответ в историю
-        if self.qa_history:
-            last_question = self.qa_history[-1]["question"]
-            self.qa_history[-1]["answer"] = user_input
-            self.qa_history[-1]["quality"] = answer_quality
+        if self.qa_history["question"]:
+            self.qa_history["answer"][-1] = user_input
+            self.qa_history["quality"][-1] = answer_quality
         
         # Генерируем следующий вопрос в зависимости от действия
-        if action == "simplify_question":
-            response = await self._generate_simpler_question(context)
-        elif action == "escalate_difficulty":
-            response = await self._generate_harder_question(context)
-        else:
-            response = await self._generate_next_question(context)
+        response = await self._dispatch_generate(action, context)
         
         # Очищаем ответ от возможных вступлений
         response = self._clean_response_text(response)
         
         # Сохраняем новый вопрос в историю
-        self.qa_history.append({
-            "question": response,
-            "answer": None,
-            "topic": self.current_topic,
-            "difficulty": self.current_difficulty,
-            "quality": None,
-            "question_number": self.question_count + 1
-        })
-        
-        self.question_count += 1
+        self._record_turn(response)
         
         return response
-
+    
+    def _record_turn(self, question: str) -> None:
+        """Учет заданного вопроса: запись в историю и увеличение счетчика."""
+        self._qa_append(
+            question=question,
+            topic=self.current_topic,
+            difficulty=self.current_difficulty,
+            question_number=self.question_count + 1
+        )
+        self.question_count += 1
+    
+    async def _dispatch_generate(self, action: str, context: Dict[str, Any]) -> str:
+        """Генерация следующего вопроса для выбранного действия."""
+        if action == "simplify_question":
+            return await self._generate_simpler_question(context)
+        if action == "escalate_difficulty":
+            return await self._generate_harder_question(context)
+        return await self._generate_next_question(context)
+    
     def _clean_response_text(self, response: str) -> str:
         """Очистка текста ответа от технических вступлений."""
         
         # Удаляем вступления о качестве предыдущих ответов
-        patterns_to_remove = [
-            r'Отлично[,\s]+учитывая.*?предлагаю следующий вопрос:',
-            r'На основе.*?рекомендации.*?следующий вопрос:',
-            r'Учитывая.*?качество.*?ответа.*?вопрос:',
-            r'Следующий вопрос:',
-            r'Давайте перейдем к следующему вопросу:',
-            r'Теперь.*?вопрос:',
-            r'^.*?[,\s]+предлагаю.*?:'
-        ]
-        
-        import re
-        for pattern in patterns_to_remove:
-            response = re.sub(pattern, '', response, flags=re.IGNORECASE)
+        for pattern in _PATTERNS_TO_REMOVE:
+            response = pattern.sub('', response)
         
         # Удаляем лишние пробелы и переносы
-        response = ' '.join(response.split())
-        
-        # Капитализируем первую букву
-        if response:
-            response = response[0].upper() + response[1:]
+        response = _RE_WS.sub(' ', response).strip()
         
         # Убедимся, что это вопрос
         if not response.endswith('?'):
             response = response.rstrip('.') + '?'
         
-        return response.strip()
+        # Капитализируем первую букву
+        return response[:1].upper() + response[1:]
     
     # async def respond(
     #     self, 
@@ -333,13 +481,12 @@ class InterviewerAgent(BaseAgent):
 Давайте начнем. Расскажите, пожалуйста, о вашем опыте работы с {context.get('technologies', ['технологиями'])[0]}."""
         
         # Сохраняем приветствие как первый "вопрос"
-        self.qa_history.append({
-            "question": greeting,
-            "answer": None,
-            "topic": "опыт и введение",
-            "difficulty": "junior",
-            "question_number": 1
-        })
+        self._qa_append(
+            question=greeting,
+            topic="опыт и введение",
+            difficulty="junior",
+            question_number=1
+        )
         
         self.question_count = 1
         self.current_topic = "опыт и введение"
@@ -353,18 +500,29 @@ class InterviewerAgent(BaseAgent):
         
         # Определяем тему для следующего вопроса
         if not self.current_topic or self.question_count > 3:
-            technologies = context.get("technologies", ["Python", "базы данных", "алгоритмы"])
+            technologies = context.get("technologies", _DEFAULT_TECHS)
             tech_index = (self.question_count // 3) % len(technologies)
             self.current_topic = technologies[tech_index]
         
-        # Формируем системный промпт
-        system_prompt = INTERVIEWER_SYSTEM_PROMPT.format(
-            position=context.get("position", "разработчик"),
-            grade=context.get("grade", "Junior"),
-            experience=context.get("experience", "не указан"),
-            technologies=", ".join(context.get("technologies", [])),
-            current_task="сгенерировать естественный технический вопрос"
+        # Формируем системный промпт (или берем уже отформатированный)
+        current_task = "сгенерировать естественный технический вопрос"
+        key = (
+            context.get("position", "разработчик"),
+            context.get("grade", "Junior"),
+            context.get("experience", "не указан"),
+            tuple(context.get("technologies", [])),
+            current_task
         )
+        system_prompt = self._sys_prompt_cache.get(key)
+        if system_prompt is None:
+            system_prompt = INTERVIEWER_SYSTEM_PROMPT.format(
+                position=key[0],
+                grade=key[1],
+                experience=key[2],
+                technologies=", ".join(key[3]),
+                current_task=current_task
+            )
+            self._sys_prompt_cache[key] = system_prompt
         
         # Определяем сложность вопроса
         difficulty = self.current_difficulty
@@ -381,7 +539,7 @@ class InterviewerAgent(BaseAgent):
         )
         
         # Генерируем вопрос
-        question = await self.llm_client.generate(system_prompt, user_prompt)
+        question = await self._gen(system_prompt, user_prompt)
         
         # Очищаем вопрос от технических артефактов
         question = self._clean_question(question)
@@ -390,66 +548,41 @@ class InterviewerAgent(BaseAgent):
         
         return question
 
+    async def _gen(self, system_prompt: str, user_prompt: str) -> str:
+        """Запрос к LLM с ограничением числа одновременных запросов."""
+        async with _llm_semaphore():
+            return await self.llm_client.generate(system_prompt, user_prompt)
+    
     def _clean_question(self, question: str) -> str:
         """Очистка вопроса от технических артефактов."""
         
         # Удаляем все в квадратных скобках
-        import re
-        question = re.sub(r'\[.*?\]', '', question)
+        question = _RE_BRACKET.sub('', question)
         
         # Удаляем все в звездочках
-        question = re.sub(r'\*.*?\*', '', question)
+        question = _RE_STAR.sub('', question)
         
         # Удаляем подчеркивания
-        question = re.sub(r'_.*?_', '', question)
+        question = _RE_UNDERSCORE.sub('', question)
         
         # Удаляем маркеры типа ---, ===
-        question = re.sub(r'^[-=]+$', '', question, flags=re.MULTILINE)
-        
-        # Удаляем текст "Дополнительные аспекты" и подобное
-        lines = question.split('\n')
-        clean_lines = []
-        skip_next = False
+        question = _RE_MARKER.sub('', question)
         
-        for line in lines:
-            line = line.strip()
-            
-            # Пропускаем пустые строки и разделители
-            if not line or line.startswith('---') or line.startswith('==='):
-                continue
-            
-            # Пропускаем строки, которые выглядят как инструкции
-            if any(keyword in line.lower() for keyword in [
-                'дополнительные аспекты', 
-                'если кандидат не затронет',
-                'рассмотрите следующие аспекты',
-                'пример хорошего вопроса',
-                'формат вопроса',
-                'сгенерируй вопрос'
-            ]):
-                continue
-            
-            # Удаляем нумерацию в начале строки (1., 2., и т.д.)
-            line = re.sub(r'^\d+\.\s*', '', line)
-            line = re.sub(r'^[-*]\s*', '', line)
-            
-            clean_lines.append(line)
+        # Удаляем строки-разделители и строки-инструкции ("Дополнительные аспекты" и подобное)
+        question = _RE_DROP_LINE.sub('', question)
         
-        # Объединяем строки
-        question = ' '.join(clean_lines)
+        # Удаляем нумерацию и маркеры списка в начале строк (1., 2., -, *)
+        question = _RE_LINE_PREFIX.sub('', question)
         
-        # Удаляем лишние пробелы
-        question = ' '.join(question.split())
+        # Объединяем строки и удаляем лишние пробелы
+        question = _RE_WS.sub(' ', question).strip()
         
         # Добавляем вопросительный знак, если его нет
         if not question.endswith('?') and len(question) > 10:
             question = question.rstrip('.') + '?'
         
         # Капитализируем первую букву
-        if question:
-            question = question[0].upper() + question[1:]
-        
-        return question.strip()
+        return question[:1].upper() + question[1:]
     
     # async def _generate_next_question(self, context: Dict[str, Any]) -> str:
     #     """Генерация следующего вопроса с учетом оценки предыдущего ответа."""
@@ -511,12 +644,7 @@ class InterviewerAgent(BaseAgent):
 
     def _increase_difficulty(self, current: str) -> str:
         """Повышение сложности."""
-        levels = ["junior", "middle", "senior"]
-        if current in levels:
-            index = levels.index(current)
-            if index < len(levels) - 1:
-                return levels[index + 1]
-        return current
+        return _DIFF_UP.get(current, current)
     
     # async def _generate_next_question(self, context: Dict[str, Any]) -> str:
     #     """Генерация следующего вопроса."""
@@ -592,20 +720,12 @@ class InterviewerAgent(BaseAgent):
         """Генерация более простого вопроса."""
         
         # Понижаем сложность
-        difficulty_levels = ["senior", "middle", "junior"]
-        if self.current_difficulty in difficulty_levels:
-            current_index = difficulty_levels.index(self.current_difficulty)
-            if current_index > 0:
-                self.current_difficulty = difficulty_levels[current_index - 1]
+        self.current_difficulty = _DIFF_DOWN.get(self.current_difficulty, self.current_difficulty)
         
         self.add_internal_thought(f"Упрощаю вопрос. Новая сложность: {self.current_difficulty}")
         
         # Берем простую тему
-        simple_topics = ["основы программирования", "базовые концепции", "фундаментальные знания"]
-        if self.question_count < len(simple_topics):
-            self.current_topic = simple_topics[self.question_count]
-        else:
-            self.current_topic = "основы программирования"
+        self.current_topic = _SIMPLE_TOPICS[self.question_count % len(_SIMPLE_TOPICS)]
         
         return await self._generate_next_question(context)
 
@@ -613,20 +733,12 @@ class InterviewerAgent(BaseAgent):
         """Генерация более сложного вопроса."""
         
         # Повышаем сложность
-        difficulty_levels = ["junior", "middle", "senior"]
-        if self.current_difficulty in difficulty_levels:
-            current_index = difficulty_levels.index(self.current_difficulty)
-            if current_index < len(difficulty_levels) - 1:
-                self.current_difficulty = difficulty_levels[current_index + 1]
+        self.current_difficulty = _DIFF_UP.get(self.current_difficulty, self.current_difficulty)
         
         self.add_internal_thought(f"Усложняю вопрос. Новая сложность: {self.current_difficulty}")
         
         # Берем сложную тему
-        complex_topics = ["архитектура систем", "оптимизация производительности", "масштабирование"]
-        if self.question_count < len(complex_topics):
-            self.current_topic = complex_topics[self.question_count]
-        else:
-            self.current_topic = "архитектура систем"
+        self.current_topic = _COMPLEX_TOPICS[self.question_count % len(_COMPLEX_TOPICS)]
         
         return await self._generate_next_question(context)
     
@@ -666,21 +778,24 @@ class InterviewerAgent(BaseAgent):
         self.add_internal_thought("Обнаружен оффтопик. Возвращаю к теме интервью.")
         
         # Получаем последний вопрос
-        last_question = self.qa_history[-1]["question"] if self.qa_history else "Предыдущий вопрос"
+        questions = self.qa_history["question"]
+        last_question = _trunc(questions[-1], 300) if questions else "Предыдущий вопрос"
+        offtopic_response = _trunc(user_input, 200)
         
         # Определяем тему оффтопика (простая эвристика)
         offtopic_topic = self._extract_offtopic_topic(user_input)
         
         try:
             # Формируем промпт для обработки оффтопика
-            response = await self.llm_client.generate_with_template(
-                template=OFFTOPIC_HANDLER_PROMPT,
-                variables={
-                    "original_question": last_question[:300],  # Ограничиваем длину
-                    "offtopic_response": user_input[:200]  # Ограничиваем длину
-                },
-                system_prompt="Ты - профессиональный интервьюер. Вежливо верни кандидата к теме интервью. Не используй квадратные скобки в ответе."
-            )
+            async with _llm_semaphore():
+                response = await self.llm_client.generate_with_template(
+                    template=OFFTOPIC_HANDLER_PROMPT,
+                    variables={
+                        "original_question": last_question,
+                        "offtopic_response": offtopic_response
+                    },
+                    system_prompt="Ты - профессиональный интервьюер. Вежливо верни кандидата к теме интервью. Не используй квадратные скобки в ответе."
+                )
             
             # Очищаем ответ от остатков шаблона
             response = self._clean_response(response)
@@ -695,21 +810,10 @@ class InterviewerAgent(BaseAgent):
     def _extract_offtopic_topic(self, response: str) -> str:
         """Извлечение темы оффтопика из ответа."""
         
-        # Простые ключевые слова
-        topics = {
-            "зарплата": ["зарплат", "оплат", "доход", "заработн"],
-            "отпуск": ["отпуск", "отпуска", "каникул"],
-            "офис": ["офис", "удаленк", "удалёнк", "рабочее место"],
-            "команда": ["команд", "коллектив", "сотрудник"],
-            "график": ["график", "расписан", "режим работы"],
-            "обучение": ["обучен", "курс", "тренинг", "образован"]
-        }
-        
-        response_lower = response.lower()
-        for topic, keywords in topics.items():
-            for keyword in keywords:
-                if keyword in response_lower:
-                    return topic
+        # Один проход по тексту, тема определяется по имени сработавшей группы
+        match = _TOPIC_RE.search(response)
+        if match:
+            return _GROUP_TO_TOPIC[match.lastgroup]
         
         return "этот вопрос"
 
@@ -717,17 +821,16 @@ class InterviewerAgent(BaseAgent):
         """Очистка ответа от артефактов шаблона."""
         
         # Удаляем текст в квадратных скобках
-        import re
-        response = re.sub(r'\[.*?\]', '', response)
+        response = _RE_BRACKET.sub('', response)
         
         # Удаляем текст в звездочках
-        response = re.sub(r'\*.*?\*', '', response)
+        response = _RE_STAR.sub('', response)
         
         # Удаляем примеры в кавычках, которые могут остаться из промпта
         response = response.replace('"Спасибо за вопрос о...', 'Спасибо за вопрос.')
         
         # Удаляем лишние пробелы и переносы
-        response = ' '.join(response.split())
+        response = _RE_WS.sub(' ', response).strip()
         
         # Обрезаем, если ответ слишком длинный
         if len(response) > 500:
@@ -761,54 +864,124 @@ class InterviewerAgent(BaseAgent):
         self.add_internal_thought("Кандидат задал встречный вопрос. Отвечаю кратко и возвращаю к интервью.")
         
         # Формируем промпт для ответа на встречный вопрос
-        response = await self.llm_client.generate_with_template(
-            template=COUNTER_QUESTION_PROMPT,
-            variables={
-                "candidate_question": user_input,
-                "context": f"Интервью на позицию {context.get('position')}"
-            },
-            system_prompt="Ты - интервьюер. Кратко ответь на вопрос кандидата и вернись к интервью."
-        )
+        async with _llm_semaphore():
+            response = await self.llm_client.generate_with_template(
+                template=COUNTER_QUESTION_PROMPT,
+                variables={
+                    "candidate_question": user_input,
+                    "context": f"Интервью на позицию {context.get('position')}"
+                },
+                system_prompt="Ты - интервьюер. Кратко ответь на вопрос кандидата и вернись к интервью."
+            )
         
         return response
     
-    async def _detect_offtopic(self, user_input: str, context: Dict[str, Any]) -> bool:
-        """Определение, является ли ответ оффтопиком."""
+    def _classify_turn(self, user_input: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Совместная классификация ответа кандидата.
         
-        # Простая эвристика для определения оффтопика
-        offtopic_keywords = ["погода", "отпуск", "зарплата", "офис", "удаленка", "команда", "начальник"]
+        Вместо трех отдельных проверок текст приводится к нижнему регистру
+        один раз и все признаки считаются по нему.
         
+        Args:
+            user_input: Ответ кандидата
+            context: Контекст интервью
+            
+        Returns:
+            Словарь {"offtopic": bool, "counter_question": bool, "quality": int}
+        """
         user_input_lower = user_input.lower()
-        for keyword in offtopic_keywords:
-            if keyword in user_input_lower:
-                return True
         
-        # Проверяем, не слишком ли короткий ответ для оффтопика
-        if len(user_input) < 20:
-            # Слишком короткий ответ - вероятно, не оффтопик
-            return False
+        # Сначала быстрые проверки, полные - только если результат не очевиден
+        is_offtopic = self._heuristic_offtopic(user_input, user_input_lower)
+        if is_offtopic is None:
+            is_offtopic = self._offtopic_in(user_input_lower)
+        
+        is_counter_question = self._heuristic_counter_question(user_input)
+        if is_counter_question is None:
+            is_counter_question = self._counter_question_in(user_input, user_input_lower)
         
-        return False
+        return {
+            "offtopic": is_offtopic,
+            "counter_question": is_counter_question,
+            "quality": self._quality_of(user_input, user_input_lower, context)
+        }
+    
+    def _detect_offtopic(self, user_input: str, context: Dict[str, Any]) -> bool:
+        """Определение, является ли ответ оффтопиком."""
+        user_input_lower = user_input.lower()
+        is_offtopic = self._heuristic_offtopic(user_input, user_input_lower)
+        if is_offtopic is None:
+            is_offtopic = self._offtopic_in(user_input_lower)
+        return is_offtopic
     
-    async def _detect_counter_question(self, user_input: str) -> bool:
+    def _detect_counter_question(self, user_input: str) -> bool:
         """Определение, содержит ли ответ встречный вопрос."""
+        is_counter_question = self._heuristic_counter_question(user_input)
+        if is_counter_question is None:
+            is_counter_question = self._counter_question_in(user_input, user_input.lower())
+        return is_counter_question
+    
+    @staticmethod
+    def _heuristic_offtopic(text: str, text_lower: Optional[str] = None) -> Optional[bool]:
+        """
+        Быстрая проверка на оффтопик.
         
-        question_keywords = ["?", "почему", "как", "что", "когда", "где", "зачем"]
-        user_input_lower = user_input.lower()
+        Args:
+            text: Ответ кандидата
+            text_lower: Тот же ответ в нижнем регистре, если уже вычислен
+        
+        Returns:
+            False для коротких ответов без ключевых слов оффтопика, None - если нужна полная проверка
+        """
+        if len(text) >= 400:
+            return None
+        if text_lower is None:
+            text_lower = text.lower()
+        if not _RE_OFFTOPIC_HINT.search(text_lower):
+            return False
+        return None
+    
+    @staticmethod
+    def _heuristic_counter_question(text: str) -> Optional[bool]:
+        """
+        Быстрая проверка на встречный вопрос.
+        
+        Returns:
+            False без знака вопроса, True для вопроса, начинающегося с вопросительного слова,
+            None - если нужна полная проверка
+        """
+        if "?" not in text:
+            return False
+        if _RE_QUESTION_START.match(text):
+            return True
+        return None
+    
+    def _evaluate_answer_quality(self, user_input: str, context: Dict[str, Any]) -> int:
+        """Улучшенная оценка качества ответа (1-10)."""
+        return self._quality_of(user_input, user_input.lower(), context)
+    
+    @staticmethod
+    def _offtopic_in(user_input_lower: str) -> bool:
+        """Эвристика оффтопика по ответу в нижнем регистре."""
+        
+        # Простая эвристика для определения оффтопика
+        return _RE_OFFTOPIC.search(user_input_lower) is not None
+    
+    @staticmethod
+    def _counter_question_in(user_input: str, user_input_lower: str) -> bool:
+        """Эвристика встречного вопроса."""
         
         # Проверяем наличие знака вопроса
         if "?" in user_input:
             return True
         
         # Проверяем вопросительные слова
-        for keyword in question_keywords:
-            if keyword in user_input_lower and len(user_input) > 10:
-                return True
-        
-        return False
+        return len(user_input) > 10 and _RE_QUESTION_WORD.search(user_input_lower) is not None
     
-    async def _evaluate_answer_quality(self, user_input: str, context: Dict[str, Any]) -> int:
-        """Улучшенная оценка качества ответа (1-10)."""
+    @staticmethod
+    def _quality_of(user_input: str, user_input_lower: str, context: Dict[str, Any]) -> int:
+        """Эвристическая оценка качества ответа (1-10)."""
         
         # Базовая оценка
         score = 5
@@ -817,27 +990,21 @@ class InterviewerAgent(BaseAgent):
         if len(user_input.strip()) < 10:
             return 2  # Слишком короткий ответ
         
-        # 2. Проверка на бессмысленные ответы
-        meaningless_patterns = [
-            "тыкаю", "не знаю", "хз", "как бы", "типа", "ну", "эээ",
-            "ага", "угу", "да нет", "наверное", "может быть",
-            "я не уверен", "скорее всего", "вроде как"
-        ]
+        # Маска найденных слов всех категорий за один проход
+        mask = 0
+        for pattern in _RE_QUALITY_SCAN.findall(user_input_lower):
+            mask |= _QUALITY_BITS[pattern]
         
-        user_input_lower = user_input.lower()
-        for pattern in meaningless_patterns:
-            if pattern in user_input_lower:
-                score -= 3  # Штраф за неопределенность
+        # 2. Проверка на бессмысленные ответы: штраф за каждое найденное слово-паразит
+        score -= 3 * (mask & _MASK_MEANINGLESS).bit_count()
         
         # 3. Проверка на уклончивые ответы
-        if any(phrase in user_input_lower for phrase in ["не помню", "забыл", "не помню точно"]):
+        if mask & _MASK_EVASIVE:
             score -= 2
         
         # 4. Проверка на конкретику - хорошие ответы содержат конкретные термины
         # (это упрощенная проверка, в реальности нужно использовать LLM)
-        tech_keywords = ["потому что", "например", "во-первых", "таким образом", "следовательно"]
-        has_structure = any(keyword in user_input_lower for keyword in tech_keywords)
-        if has_structure:
+        if mask & _MASK_STRUCTURE:
             score += 2
         
         # 5. Проверка на использование технических терминов (если контекст позволяет)
@@ -878,12 +1045,37 @@ class InterviewerAgent(BaseAgent):
     #     # Ограничиваем диапазон 1-10
     #     return max(1, min(10, score))
     
+    def _qa_append(
+        self,
+        question: str,
+        topic: Optional[str],
+        difficulty: str,
+        question_number: int
+    ) -> None:
+        """Добавление нового вопроса в историю (ответ и оценка заполняются позже)."""
+        history = self.qa_history
+        history["question"].append(question)
+        history["answer"].append(None)
+        history["topic"].append(topic)
+        history["difficulty"].append(difficulty)
+        history["quality"].append(None)
+        history["question_number"].append(question_number)
+        
+        if topic and topic not in self._topics_seen:
+            self._topics_seen.add(topic)
+            self.topics_covered.append(topic)
+    
+    def get_qa_records(self) -> List[Dict[str, Any]]:
+        """История вопросов и ответов в виде списка записей (по словарю на вопрос)."""
+        history = self.qa_history
+        return [dict(zip(_QA_COLUMNS, row)) for row in zip(*(history[column] for column in _QA_COLUMNS))]
+    
     def get_interview_summary(self) -> Dict[str, Any]:
         """Получение сводки по интервью."""
         
         return {
             "total_questions": self.question_count,
-            "topics_covered": list(set([qa.get("topic", "") for qa in self.qa_history if qa.get("topic")])),
+            "topics_covered": list(self.topics_covered),
             "difficulty_progression": self.current_difficulty,
-            "qa_history": self.qa_history
+            "qa_history": self.get_qa_records()
         }
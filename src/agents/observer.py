@@ -4,9 +4,15 @@
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+import hashlib
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Deque, Dict, Any, FrozenSet, List, Optional, Sequence
 import logging
-from ..core.llm_client import MistralClientFactory
+from ..core.llm_client import FALLBACK_RESPONSE, MistralClient, MistralClientFactory
 from .base_agent import BaseAgent
 from config.prompts import (
     BASE_SYSTEM_PROMPT,
@@ -16,10 +22,211 @@ from config.prompts import (
 
 logger = logging.getLogger(__name__)
 
+# Маркеры в тексте анализа (в нижнем регистре)
+_QUALITY_MARKERS = (
+    (("отличн", "10/10"), 9),
+    (("хорошо", "8/10"), 8),
+    (("удовлетворительно", "6/10"), 6),
+    (("плохо", "3/10"), 3),
+)
+_CONFIDENCE_MARKERS = (
+    ("высокая уверенность", 0.8),
+    ("средняя уверенность", 0.5),
+    ("низкая уверенность", 0.2),
+)
+_HALLUCINATION_MARKERS = (
+    "галлюцинации: да", "ложные утверждения", "выдумал",
+    "ошибочно утверждает", "не соответствует фактам"
+)
+_RECOMMENDATION_MARKERS = (
+    (("галлюцинации: да", "выдум"), "вежливо указать на неточность и задать уточняющий вопрос по той же теме"),
+    (("не знаю", "не ответил"), "упростить вопрос или перейти к более базовой теме"),
+    (("отличн", "превосходн"), "усложнить следующий вопрос или перейти к более продвинутой теме"),
+    (("уверенность: низк",), "задать более простой вопрос для восстановления уверенности кандидата"),
+)
+_DEFAULT_RECOMMENDATION = "продолжить интервью с текущей темой и сложностью"
+
+# Уточнения рекомендации по позиции (берется первое совпадение)
+_POSITION_SUFFIXES = (
+    ("backend", " с акцентом на практические задачи бэкенда"),
+    ("frontend", " с фокусом на интерфейсные технологии"),
+)
+
+_ANALYSIS_MARKERS = frozenset(
+    [m for markers, _ in _QUALITY_MARKERS for m in markers]
+    + [m for m, _ in _CONFIDENCE_MARKERS]
+    + list(_HALLUCINATION_MARKERS)
+    + [m for markers, _ in _RECOMMENDATION_MARKERS for m in markers]
+)
+# Маркеры, начинающиеся в той же позиции (например, "выдумал" включает "выдум")
+_MARKER_PREFIXES = {
+    m: tuple(k for k in _ANALYSIS_MARKERS if m.startswith(k))
+    for m in _ANALYSIS_MARKERS
+}
+# Один проход по анализу: оценки "ТОЧНОСТЬ/УВЕРЕННОСТЬ: X/10" и все маркеры,
+# lookahead находит совпадения в каждой позиции, в том числе перекрывающиеся
+_RE_ANALYSIS = re.compile(
+    r"(?=(?:точность:\s*(?P<quality>\d+)/10|уверенность:\s*(?P<confidence>\d+)/10|(?P<marker>"
+    + "|".join(map(re.escape, sorted(_ANALYSIS_MARKERS, key=len, reverse=True)))
+    + ")))"
+)
+
+# Ключевые слова эвристик (в нижнем регистре)
+_MEANINGLESS_ANSWER_WORDS = frozenset((
+    "не знаю", "хз", "не помню", "забыл", "тыкаю", "как бы",
+    "типа", "ну", "эээ", "ага", "угу", "да нет",
+    "скорее всего", "возможно", "может быть", "наверное"
+))
+
+# Признаки плохого и хорошего ответа в анализе Observer
+_BAD_SIGNS = frozenset((
+    "не знаю", "не уверен", "не помню", "забыл", "галлюцинации: да",
+    "ошибка", "неправильно", "неверно", "частично верный", "неполный",
+    "не раскрыл", "пробелы"
+))
+_GOOD_SIGNS = frozenset((
+    "точно", "правильно", "верно", "полный", "полностью",
+    "хорошо", "отлично", "превосходно", "исчерпывающе"
+))
+
+# Бессмысленные ответы
+_MEANINGLESS_RESPONSE_WORDS = frozenset((
+    "тыкаю туда сюда", "не знаю что сказать", "давайте дальше",
+    "хз", "эээ", "ну", "как бы", "типа того"
+))
+
+# Ответы, которые оцениваются без запроса к LLM: одно служебное слово (чистые "да"/"нет")
+# или одно слово, повторяющее вопрос. Ответ из нескольких слов, даже взятых из вопроса
+# или служебных, может быть верным (вопрос с выбором, "нет, потому что...") - его оценивает LLM
+_STOPWORDS = frozenset((
+    "и", "в", "во", "не", "что", "он", "на", "я", "с", "со", "как", "а", "то", "все",
+    "она", "так", "его", "но", "да", "ты", "к", "у", "же", "вы", "за", "бы", "по",
+    "только", "ее", "мне", "было", "вот", "от", "меня", "еще", "нет", "о", "из",
+    "ему", "когда", "даже", "ну", "ли", "если", "уже", "или", "ни", "быть", "был",
+    "до", "там", "потом", "себя", "ничего", "может", "они", "тут", "где", "есть",
+    "надо", "для", "мы", "их", "чем", "была", "сам", "без", "чего", "раз", "тоже",
+    "под", "будет", "тогда", "кто", "этот", "это", "того", "потому", "этого",
+    "какой", "здесь", "этом", "тем", "чтобы", "сейчас", "были", "можно", "при",
+    "об", "тот", "через", "эти", "про", "всего", "них", "эту", "этой", "том", "такой"
+))
+_RE_WORD = re.compile(r"\w+")
+_DIRECT_ANALYSIS_TEMPLATE = (
+    "ТОЧНОСТЬ: 2/10 - кандидат не ответил на вопрос по существу: {reason}\n"
+    "ПОЛНОТА: 1/10 - содержательной части нет\n"
+    "УВЕРЕННОСТЬ: 3/10 - ответ не позволяет оценить уверенность\n"
+    "ГАЛЛЮЦИНАЦИИ: Нет\n"
+    "ПРОБЕЛЫ: тема вопроса не раскрыта\n"
+    "РЕКОМЕНДАЦИЯ: упростить вопрос или попросить развернутый ответ"
+)
+
+# Поля истории оценок (хранятся по столбцам)
+_EVALUATION_COLUMNS = ("question", "answer", "analysis", "recommendation", "timestamp")
+
+# Уровни сложности (от высокого к низкому)
+_DIFFICULTY_LEVELS = ("senior", "middle", "junior")
+
+# Роли, от имени которых Interviewer задает вопросы
+_ASSISTANT_ROLES = frozenset(("assistant", "interviewer"))
+
+
+def _keywords_re(keywords: FrozenSet[str]) -> "re.Pattern[str]":
+    """Регулярное выражение, находящее любое из ключевых слов за один проход по тексту."""
+    return re.compile("|".join(map(re.escape, sorted(keywords))))
+
+
+_RE_MEANINGLESS_ANSWER = _keywords_re(_MEANINGLESS_ANSWER_WORDS)
+_RE_BAD_SIGNS = _keywords_re(_BAD_SIGNS)
+_RE_GOOD_SIGNS = _keywords_re(_GOOD_SIGNS)
+_RE_MEANINGLESS_RESPONSE = _keywords_re(_MEANINGLESS_RESPONSE_WORDS)
+
+
+@dataclass(frozen=True, slots=True)
+class AnalysisVerdict:
+    """Результат разбора текста анализа Observer."""
+    quality: int
+    confidence: float
+    has_hallucinations: bool
+    recommendation: str
+
+
+@dataclass(frozen=True, slots=True)
+class EvaluationRecord:
+    """Одна оценка ответа кандидата."""
+    question: str
+    answer: str
+    analysis: str
+    recommendation: str
+    timestamp: float
+
+
+def _parse_analysis(analysis: str) -> AnalysisVerdict:
+    """
+    Разбор анализа за один проход: оценка качества, уверенность,
+    наличие галлюцинаций и базовая рекомендация для Interviewer.
+    """
+    quality = confidence = None
+    found = set()
+    
+    for match in _RE_ANALYSIS.finditer(analysis.lower()):
+        marker = match.group("marker")
+        if marker is not None:
+            found.update(_MARKER_PREFIXES[marker])
+        elif match.group("quality") is not None:
+            if quality is None:
+                quality = int(match.group("quality"))
+        elif confidence is None:
+            confidence = int(match.group("confidence")) / 10.0  # Конвертируем в 0-1
+    
+    # Альтернативный поиск по ключевым словам
+    if quality is None:
+        quality = next(
+            (score for markers, score in _QUALITY_MARKERS if not found.isdisjoint(markers)),
+            5  # Средняя оценка по умолчанию
+        )
+    if confidence is None:
+        confidence = next(
+            (score for marker, score in _CONFIDENCE_MARKERS if marker in found),
+            0.5  # По умолчанию
+        )
+    
+    recommendation = next(
+        (text for markers, text in _RECOMMENDATION_MARKERS if not found.isdisjoint(markers)),
+        _DEFAULT_RECOMMENDATION
+    )
+    
+    return AnalysisVerdict(
+        quality=quality,
+        confidence=confidence,
+        has_hallucinations=not found.isdisjoint(_HALLUCINATION_MARKERS),
+        recommendation=recommendation
+    )
+
+
+@lru_cache(maxsize=64)
+def _position_suffix(position: str) -> str:
+    """Уточнение рекомендации для позиции (позиция не меняется в рамках интервью)."""
+    position_lower = position.lower()
+    return next((suffix for key, suffix in _POSITION_SUFFIXES if key in position_lower), "")
+
+
+@lru_cache(maxsize=256)
+def _tokenize(text: str) -> FrozenSet[str]:
+    """Множество слов текста в нижнем регистре (вопросы повторяются в рамках сессии)."""
+    return frozenset(text.lower().split())
+
+
+@lru_cache(maxsize=256)
+def _words(text: str) -> FrozenSet[str]:
+    """Множество слов текста без знаков препинания, в нижнем регистре."""
+    return frozenset(_RE_WORD.findall(text.lower()))
+
 
 class ObserverAgent(BaseAgent):
     """Агент-наблюдатель для анализа ответов кандидата."""
     
+    # Максимальное количество хранимых оценок (сводка считается по всем оценкам)
+    EVALUATION_HISTORY_SIZE = 200
+    
     def __init__(
         self,
         name: str = "Наблюдатель",
@@ -36,23 +243,40 @@ class ObserverAgent(BaseAgent):
         """
         super().__init__(name=name, role="observer", **kwargs)
         
-        # Инициализация LLM клиента
-        self.llm_client = MistralClientFactory.create_client(
-            model=llm_model,
-            temperature=0.3,  # Более консервативный для анализа
-            max_tokens=800
-        )
+        # LLM клиент создается при первом запросе к модели (см. свойство llm_client)
+        self._llm_model = llm_model
+        self._llm_client: Optional[MistralClient] = None
         
-        # История оценок
-        self.evaluation_history: List[Dict[str, Any]] = []
+        # История оценок по столбцам и накопленные по всем оценкам счетчики для сводки
+        self.evaluation_history: Dict[str, Deque[Any]] = {
+            column: deque(maxlen=self.EVALUATION_HISTORY_SIZE) for column in _EVALUATION_COLUMNS
+        }
+        self._evaluation_count = 0
+        self._confidence_sum = 0.0
+        self._hallucination_count = 0
         
         logger.info(f"Агент Observer '{name}' инициализирован")
     
+    @property
+    def llm_client(self) -> MistralClient:
+        """LLM клиент Observer: общий для всех наблюдателей с той же моделью, создается лениво."""
+        if self._llm_client is None:
+            self._llm_client = MistralClientFactory.get_shared_client(
+                model=self._llm_model,
+                temperature=0.3,  # Более консервативный для анализа
+                max_tokens=800
+            )
+        return self._llm_client
+    
+    @llm_client.setter
+    def llm_client(self, client: MistralClient) -> None:
+        self._llm_client = client
+    
     async def think(
         self, 
         user_input: str, 
         context: Dict[str, Any],
-        conversation_history: List[Dict[str, str]]
+        conversation_history: Sequence[Dict[str, str]]
     ) -> Dict[str, Any]:
         """
         Observer анализирует ответ кандидата и генерирует рекомендации.
@@ -60,8 +284,8 @@ class ObserverAgent(BaseAgent):
         
         self.add_internal_thought(f"Анализирую ответ кандидата: '{user_input[:150]}...'")
         
-        # Получаем последний вопрос из истории диалога
-        last_question = self._extract_last_question(conversation_history)
+        # Последний вопрос передается в контексте, иначе ищем его в истории диалога
+        last_question = context.get("last_question") or self._extract_last_question(conversation_history)
         
         # Анализируем ответ
         analysis = await self._analyze_answer(
@@ -71,17 +295,19 @@ class ObserverAgent(BaseAgent):
         )
         
         # Генерируем рекомендацию для Interviewer
-        recommendation = await self._generate_recommendation(analysis, context)
+        verdict = _parse_analysis(analysis)
+        recommendation = self._generate_recommendation(verdict, context)
         
         # Сохраняем оценку в историю
-        evaluation_record = {
-            "question": last_question,
-            "answer": user_input,
-            "analysis": analysis,
-            "recommendation": recommendation,
-            "timestamp": asyncio.get_event_loop().time()
-        }
-        self.evaluation_history.append(evaluation_record)
+        history = self.evaluation_history
+        history["question"].append(last_question)
+        history["answer"].append(user_input)
+        history["analysis"].append(analysis)
+        history["recommendation"].append(recommendation)
+        history["timestamp"].append(asyncio.get_running_loop().time())
+        self._evaluation_count += 1
+        self._confidence_sum += verdict.confidence
+        self._hallucination_count += verdict.has_hallucinations
         
         thoughts = f"""
         ЗАВЕРШЕН АНАЛИЗ ОТВЕТА КАНДИДАТА:
@@ -113,7 +339,7 @@ class ObserverAgent(BaseAgent):
         self, 
         user_input: str, 
         context: Dict[str, Any],
-        conversation_history: List[Dict[str, str]]
+        conversation_history: Sequence[Dict[str, str]]
     ) -> str:
         """
         Observer не отвечает напрямую пользователю.
@@ -136,8 +362,11 @@ class ObserverAgent(BaseAgent):
         
         self.add_internal_thought(f"Запускаю анализ ответа на вопрос: '{question[:100]}...'")
         
+        # Ответ приводится к нижнему регистру один раз для всех проверок
+        answer_lower = answer.lower()
+        
         # Проверяем, является ли ответ содержательным
-        is_meaningful = self._is_answer_meaningful(answer, question)
+        is_meaningful = self._is_answer_meaningful(answer, question, answer_lower)
         
         # Если ответ не содержательный, сразу возвращаем рекомендацию об упрощении
         if not is_meaningful:
@@ -149,77 +378,87 @@ class ObserverAgent(BaseAgent):
                 "answer_quality": 2
             }
         
-        # Если ответ содержательный, проводим полный анализ
-        analysis = await self._analyze_answer(question, answer, context)
+        # Если ответ содержательный, проводим полный анализ (очевидные случаи - без LLM)
+        analysis = self._try_direct_analysis(question, answer, answer_lower)
+        if analysis is None:
+            analysis = await self._analyze_answer(question, answer, context)
         
-        # Извлекаем оценку качества из анализа
-        answer_quality = self._extract_quality_score(analysis)
+        # Извлекаем оценки из анализа за один проход
+        verdict = _parse_analysis(analysis)
         
         # Генерируем рекомендацию на основе анализа
-        recommendation = await self._generate_recommendation(analysis, context)
+        recommendation = self._generate_recommendation(verdict, context)
         
         return {
             "analysis": analysis,
             "recommendation": recommendation,
-            "has_hallucinations": self._detect_hallucinations_in_analysis(analysis),
-            "confidence_score": self._extract_confidence_score(analysis),
-            "answer_quality": answer_quality
+            "has_hallucinations": verdict.has_hallucinations,
+            "confidence_score": verdict.confidence,
+            "answer_quality": verdict.quality
         }
 
-    def _is_answer_meaningful(self, answer: str, question: str) -> bool:
-        """Проверка, является ли ответ содержательным."""
+    def _try_direct_analysis(
+        self,
+        question: str,
+        answer: str,
+        answer_lower: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Готовый анализ для ответов, оценка которых очевидна без LLM.
+        
+        Args:
+            question: Вопрос интервьюера
+            answer: Ответ кандидата
+            answer_lower: Ответ в нижнем регистре, если уже вычислен
+            
+        Returns:
+            Текст анализа в формате EVALUATION_PROMPT или None, если нужен полный анализ
+        """
+        if answer_lower is None:
+            answer_lower = answer.lower()
+        answer_words = set(_RE_WORD.findall(answer_lower))
+        if len(answer_words) > 1:
+            return None
+        
+        if answer_words <= _STOPWORDS:
+            reason = "ответ состоит только из служебных слов"
+        elif answer_words <= _words(question):
+            reason = "ответ повторяет слова вопроса"
+        else:
+            return None
+        
+        self.add_internal_thought(f"Анализ без LLM: {reason}")
+        return _DIRECT_ANALYSIS_TEMPLATE.format(reason=reason)
+    
+    def _is_answer_meaningful(
+        self,
+        answer: str,
+        question: str,
+        answer_lower: Optional[str] = None
+    ) -> bool:
+        """Проверка, является ли ответ содержательным (answer_lower - уже приведенный к нижнему регистру ответ)."""
         
         # Минимальная длина содержательного ответа
         if len(answer.strip()) < 15:
             return False
         
         # Проверка на бессмысленные или уклончивые ответы
-        meaningless_patterns = [
-            "не знаю", "хз", "не помню", "забыл", "тыкаю", "как бы",
-            "типа", "ну", "эээ", "ага", "угу", "да нет",
-            "скорее всего", "возможно", "может быть", "наверное"
-        ]
-        
-        answer_lower = answer.lower()
-        for pattern in meaningless_patterns:
-            if pattern in answer_lower:
-                return False
+        if answer_lower is None:
+            answer_lower = answer.lower()
+        if _RE_MEANINGLESS_ANSWER.search(answer_lower):
+            return False
         
         # Проверка, что ответ хотя бы пытается ответить на вопрос
         # (простая эвристика: ответ должен содержать хотя бы одно из ключевых слов вопроса)
-        question_keywords = set(question.lower().split())
-        answer_words = set(answer_lower.split())
-        common_words = question_keywords.intersection(answer_words)
+        question_keywords = _tokenize(question)
+        has_common_word = any(word in question_keywords for word in answer_lower.split())
         
-        if len(common_words) == 0:
+        if not has_common_word:
             # Ответ не содержит ни одного слова из вопроса - возможно, оффтоп
             return False
         
         return True
 
-    def _extract_quality_score(self, analysis: str) -> int:
-        """Извлечение оценки качества из анализа."""
-        import re
-        
-        # Ищем паттерн "ТОЧНОСТЬ: X/10"
-        pattern = r"ТОЧНОСТЬ:\s*(\d+)/10"
-        match = re.search(pattern, analysis, re.IGNORECASE)
-        
-        if match:
-            return int(match.group(1))
-        
-        # Альтернативный поиск по ключевым словам
-        if "отличн" in analysis.lower() or "10/10" in analysis.lower():
-            return 9
-        elif "хорошо" in analysis.lower() or "8/10" in analysis.lower():
-            return 8
-        elif "удовлетворительно" in analysis.lower() or "6/10" in analysis.lower():
-            return 6
-        elif "плохо" in analysis.lower() or "3/10" in analysis.lower():
-            return 3
-        else:
-            return 5  # Средняя оценка по умолчанию
-    
     # async def analyze_and_recommend(
     #     self,
     #     question: str,
@@ -315,129 +554,73 @@ class ObserverAgent(BaseAgent):
             answer=answer
         )
         
+        # Одинаковые промпты (повторяющиеся ответы) не требуют нового запроса к LLM
+        hasher = hashlib.blake2b(system_prompt.encode("utf-8"), digest_size=16)
+        hasher.update(b"\0")
+        hasher.update(user_prompt.encode("utf-8"))
+        key = f"analysis:{hasher.hexdigest()}"
+        
+        analysis = self._prefix_cache_get(key)
+        if analysis is not None:
+            self.add_internal_thought("Анализ взят из кэша (повторный ответ)")
+            return analysis
+        
         # Генерируем анализ
         analysis = await self.llm_client.generate(system_prompt, user_prompt)
         
+        # Заглушку при ошибке API не кэшируем
+        if analysis != FALLBACK_RESPONSE:
+            self._prefix_cache_put(key, analysis)
+        
         return analysis
     
-    async def _generate_recommendation(
+    def _generate_recommendation(
         self,
-        analysis: str,
+        verdict: AnalysisVerdict,
         context: Dict[str, Any]
     ) -> str:
-        """Генерация рекомендации для Interviewer на основе анализа."""
-        
-        # Анализируем текст анализа для извлечения ключевых моментов
-        recommendation_rules = [
-            ("ТОЧНОСТЬ: [0-5]/10", "упростить вопрос или дать подсказку"),
-            ("ТОЧНОСТЬ: [6-7]/10", "продолжить текущую тему"),
-            ("ТОЧНОСТЬ: [8-10]/10", "усложнить вопрос или сменить тему"),
-            ("ГАЛЛЮЦИНАЦИИ: Да", "вежливо указать на ошибку и задать уточняющий вопрос"),
-            ("ПРОБЕЛЫ:", "задать вопрос по выявленным пробелам"),
-            ("УВЕРЕННОСТЬ: [0-5]/10", "задать более простой вопрос для восстановления уверенности"),
-            ("УВЕРЕННОСТЬ: [6-10]/10", "продолжить с текущей сложностью")
-        ]
-        
-        # Определяем рекомендацию на основе анализа
-        recommendation = "продолжить интервью с текущей темой и сложностью"
-        
-        analysis_lower = analysis.lower()
-        
-        if "галлюцинации: да" in analysis_lower or "выдум" in analysis_lower:
-            recommendation = "вежливо указать на неточность и задать уточняющий вопрос по той же теме"
-        elif "не знаю" in analysis_lower or "не ответил" in analysis_lower:
-            recommendation = "упростить вопрос или перейти к более базовой теме"
-        elif "отличн" in analysis_lower or "превосходн" in analysis_lower:
-            recommendation = "усложнить следующий вопрос или перейти к более продвинутой теме"
-        elif "уверенность: низк" in analysis_lower:
-            recommendation = "задать более простой вопрос для восстановления уверенности кандидата"
-        
-        # Добавляем контекстные детали
-        position = context.get("position", "")
-        if "backend" in position.lower():
-            recommendation += " с акцентом на практические задачи бэкенда"
-        elif "frontend" in position.lower():
-            recommendation += " с фокусом на интерфейсные технологии"
+        """Генерация рекомендации для Interviewer на основе разобранного анализа."""
         
-        return recommendation
+        # Базовая рекомендация уже выбрана при разборе, добавляем контекстные детали
+        return verdict.recommendation + _position_suffix(context.get("position", ""))
     
-    def _extract_last_question(self, conversation_history: List[Dict[str, str]]) -> str:
+    def _extract_last_question(self, conversation_history: Sequence[Dict[str, str]]) -> str:
         """Извлечение последнего вопроса из истории диалога."""
         
         # Ищем последнее сообщение от ассистента (Interviewer)
         for message in reversed(conversation_history):
-            if message.get("role") in ["assistant", "interviewer"]:
+            if message.get("role") in _ASSISTANT_ROLES:
                 return message.get("content", "Вопрос не найден")
         
         return "Расскажите о вашем опыте"
     
-    def _detect_hallucinations_in_analysis(self, analysis: str) -> bool:
-        """Определение, выявил ли анализ галлюцинации."""
-        
-        hallucination_keywords = [
-            "галлюцинации: да",
-            "ложные утверждения",
-            "выдумал",
-            "ошибочно утверждает",
-            "не соответствует фактам"
-        ]
-        
-        analysis_lower = analysis.lower()
-        for keyword in hallucination_keywords:
-            if keyword in analysis_lower:
-                return True
-        
-        return False
-    
-    def _extract_confidence_score(self, analysis: str) -> float:
-        """Извлечение оценки уверенности из анализа."""
-        
-        import re
-        
-        # Ищем паттерн "УВЕРЕННОСТЬ: X/10"
-        pattern = r"УВЕРЕННОСТЬ:\s*(\d+)/10"
-        match = re.search(pattern, analysis, re.IGNORECASE)
-        
-        if match:
-            score = int(match.group(1))
-            return score / 10.0  # Конвертируем в 0-1
-        
-        # Альтернативный поиск
-        if "высокая уверенность" in analysis.lower():
-            return 0.8
-        elif "средняя уверенность" in analysis.lower():
-            return 0.5
-        elif "низкая уверенность" in analysis.lower():
-            return 0.2
-        
-        return 0.5  # По умолчанию
-    
     def get_evaluation_summary(self) -> Dict[str, Any]:
         """Получение сводки всех оценок."""
         
-        if not self.evaluation_history:
+        if not self._evaluation_count:
             return {"total_evaluations": 0, "average_confidence": 0}
         
-        # Вычисляем среднюю уверенность
-        confidence_scores = []
-        hallucination_count = 0
+        # Средняя уверенность по накопленным счетчикам, без повторного разбора анализов
+        avg_confidence = self._confidence_sum / self._evaluation_count
         
-        for eval_record in self.evaluation_history:
-            analysis = eval_record.get("analysis", "")
-            confidence = self._extract_confidence_score(analysis)
-            confidence_scores.append(confidence)
-            
-            if self._detect_hallucinations_in_analysis(analysis):
-                hallucination_count += 1
-        
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
+        # Последние 5 рекомендаций
+        recommendations = self.evaluation_history["recommendation"]
         
         return {
-            "total_evaluations": len(self.evaluation_history),
+            "total_evaluations": self._evaluation_count,
             "average_confidence": round(avg_confidence, 2),
-            "hallucination_count": hallucination_count,
-            "recommendations": [e.get("recommendation", "") for e in self.evaluation_history[-5:]]  # Последние 5 рекомендаций
+            "hallucination_count": self._hallucination_count,
+            "recommendations": list(islice(recommendations, max(0, len(recommendations) - 5), None))
         }
+    
+    def get_evaluation_records(self) -> List[EvaluationRecord]:
+        """Сохраненные оценки в виде списка записей."""
+        history = self.evaluation_history
+        return [
+            EvaluationRecord(*row)
+            for row in zip(*(history[column] for column in _EVALUATION_COLUMNS))
+        ]
+    
     async def _update_interview_state(
         self,
         user_response: str,
@@ -482,76 +665,43 @@ class ObserverAgent(BaseAgent):
             f"Рекомендация Observer: {recommendation}"
         )
 
-    def _is_good_answer_based_on_analysis(self, analysis: str, user_response: str) -> bool:
+    def _is_good_answer_based_on_analysis(
+        self,
+        analysis: str,
+        user_response: str,
+        analysis_lower: Optional[str] = None,
+        user_response_lower: Optional[str] = None
+    ) -> bool:
         """Определение качества ответа на основе анализа Observer."""
         
-        analysis_lower = analysis.lower()
-        user_lower = user_response.lower()
-        
-        # Признаки плохого ответа
-        bad_signs = [
-            "не знаю",
-            "не уверен", 
-            "не помню",
-            "забыл",
-            "галлюцинации: да",
-            "ошибка",
-            "неправильно",
-            "неверно",
-            "частично верный",
-            "неполный",
-            "не раскрыл",
-            "пробелы"
-        ]
+        # Сначала проверяем короткий ответ кандидата: для осмысленного ответа
+        # признаки хорошего ответа в длинном анализе искать не нужно
+        meaningful = self._is_response_meaningful(user_response, user_response_lower)
         
-        # Признаки хорошего ответа
-        good_signs = [
-            "точно",
-            "правильно", 
-            "верно",
-            "полный",
-            "полностью",
-            "хорошо",
-            "отлично",
-            "превосходно",
-            "исчерпывающе"
-        ]
+        if analysis_lower is None:
+            analysis_lower = analysis.lower()
         
         # Если анализ содержит признаки плохого ответа
-        for sign in bad_signs:
-            if sign in analysis_lower:
-                return False
+        if _RE_BAD_SIGNS.search(analysis_lower):
+            return False
         
-        # Если анализ содержит признаки хорошего ответа
-        for sign in good_signs:
-            if sign in analysis_lower:
-                return True
+        if meaningful:
+            return True
         
-        # Если анализ неоднозначный, проверяем сам ответ
-        return self._is_response_meaningful(user_response)
+        # Бессмысленный ответ считается хорошим, только если анализ его хвалит
+        return bool(_RE_GOOD_SIGNS.search(analysis_lower))
 
-    def _is_response_meaningful(self, response: str) -> bool:
+    def _is_response_meaningful(self, response: str, response_lower: Optional[str] = None) -> bool:
         """Проверка, является ли ответ осмысленным."""
         
         if len(response.strip()) < 15:
             return False
         
         # Проверка на бессмысленные ответы
-        meaningless_responses = [
-            "тыкаю туда сюда",
-            "не знаю что сказать",
-            "давайте дальше",
-            "хз",
-            "эээ",
-            "ну",
-            "как бы",
-            "типа того"
-        ]
-        
-        response_lower = response.lower()
-        for meaningless in meaningless_responses:
-            if meaningless in response_lower:
-                return False
+        if response_lower is None:
+            response_lower = response.lower()
+        if _RE_MEANINGLESS_RESPONSE.search(response_lower):
+            return False
         
         # Проверка, содержит ли ответ хотя бы одно законченное предложение
         if "." not in response and "!" not in response and "?" not in response:
@@ -563,11 +713,9 @@ class ObserverAgent(BaseAgent):
 
     def _decrease_difficulty(self):
         """Упрощение сложности вопросов."""
-        difficulty_levels = ["senior", "middle", "junior"]
-        
-        if self.current_difficulty in difficulty_levels:
-            current_index = difficulty_levels.index(self.current_difficulty)
+        if self.current_difficulty in _DIFFICULTY_LEVELS:
+            current_index = _DIFFICULTY_LEVELS.index(self.current_difficulty)
             if current_index > 0:
-                self.current_difficulty = difficulty_levels[current_index - 1]
+                self.current_difficulty = _DIFFICULTY_LEVELS[current_index - 1]
         
         self.add_internal_thought(f"Сложность понижена до {self.current_difficulty}")
@@ -4,17 +4,84 @@
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
+import re
+from bisect import bisect_right
+from collections import ChainMap
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
 import logging
 from datetime import datetime
 
-from .memory_manager import InterviewMemory
+from .memory_manager import InterviewMemory, canonical_topic
 from .json_logger import InterviewJSONLogger, set_global_logger
 from ..agents.interviewer import InterviewerAgent
 from ..agents.observer import ObserverAgent
+from .llm_client import FALLBACK_RESPONSE
 
 logger = logging.getLogger(__name__)
 
+# Уровни сложности по возрастанию и их индексы
+_DIFFICULTY_LEVELS = ("junior", "middle", "senior")
+_DIFFICULTY_INDEX = {level: index for index, level in enumerate(_DIFFICULTY_LEVELS)}
+
+# Смена фазы интервью при достижении количества вопросов
+_PHASE_AT_QUESTION = {5: "deep_dive", 10: "closing"}
+
+# Служебная разметка в ответах модели: [..], *..*, _.._ (в пределах строки)
+_RE_BRACKETS = re.compile(r'\[[^\]\n]*\]')
+_RE_MARKUP = re.compile(r'\[[^\]\n]*\]|\*[^*\n]*\*|_[^_\n]*_')
+
+# Просьба кандидата завершить интервью (в нижнем регистре): отдельные слова
+# сравниваются с токенами ответа целиком ("наконец" не считается), фразы - подстрокой
+_END_TOKENS = frozenset({"завершить", "фидбэк", "конец", "finish", "feedback", "завершите"})
+_END_PHRASES = ("стоп интервью", "stop interview")
+_RE_WORD = re.compile(r"\w+")
+
+# Пороги точности ответов и соответствующие им грейд, решение о найме и резюме
+_ACCURACY_THRESHOLDS = (0.4, 0.6, 0.8)
+_GRADES = ("Trainee", "Junior", "Middle", "Senior")
+_HIRING_RECOMMENDATIONS = ("No Hire", "No Hire", "Hire", "Strong Hire")
+_SUMMARY_TEMPLATES = (
+    "Кандидат показал низкий уровень знаний. "
+    "Требуется фундаментальное обучение основам программирования. "
+    "Не рекомендуется к найму на текущий момент.",
+    
+    "Кандидат находится на уровне {grade}. "
+    "Требуется дополнительное обучение и практика. "
+    "Рекомендуется пройти стажировку или курсы повышения квалификации.",
+    
+    "Кандидат показал хорошие базовые знания на уровне {grade}. "
+    "Есть понимание основных концепций, но требуются дополнительные знания в некоторых областях. "
+    "Может рассматриваться на позицию с менторингом.",
+    
+    "Кандидат продемонстрировал отличные технические знания, соответствующие уровню {grade}. "
+    "Ответы были точными, развернутыми и демонстрировали глубокое понимание тем. "
+    "Рекомендуется к найму.",
+)
+
+# Темы с высоким приоритетом в roadmap (в нижнем регистре)
+_RE_HIGH_PRIORITY = re.compile('python|основ|баз')
+
+# Ресурсы roadmap, не зависящие от темы (f-строки с темой остаются на месте:
+# они быстрее str.format по шаблону)
+_ROADMAP_STATIC_RESOURCES = ("Документация и руководства", "Практические упражнения")
+_BASIC_ROADMAP_RESOURCES = (
+    "Бесплатные курсы на Stepik/Coursera",
+    "Практические задания на LeetCode/HackerRank",
+    "Документация и книги по теме"
+)
+
+# Пустая оценка для вопросов без оценки (только для чтения, без аллокации на каждый вопрос)
+_NO_EVALUATION: Mapping[str, Any] = MappingProxyType({})
+
+# Максимум одновременных запросов к LLM при генерации фидбэка
+_FEEDBACK_LLM_CONCURRENCY = 4
+
+# Строки с техническими комментариями (в нижнем регистре)
+_RE_SKIP_KEYWORDS = re.compile(
+    'следующий вопрос|предлагаю|рассмотрите|дополнительные аспекты|если кандидат'
+)
+
 
 class InterviewCoordinator:
     """Координатор для управления взаимодействием агентов."""
@@ -54,9 +121,18 @@ class InterviewCoordinator:
         # Состояние интервью
         self.is_interview_active = False
         self.current_topic: Optional[str] = None
-        self.current_difficulty: str = "junior"
+        self._difficulty_idx: int = 0  # индекс в _DIFFICULTY_LEVELS (см. current_difficulty)
         self.interview_phase: str = "greeting"  # greeting, technical, challenge, closing
         
+        # Рекомендации по изучению тем (не меняются в рамках сессии)
+        self._recommendation_cache: Dict[str, str] = {}
+        
+        # Оценка soft skills: (ключ состояния истории, результат), см. _assess_soft_skills
+        self._soft_skills_cache: Optional[Tuple[Tuple[Any, ...], Dict[str, str]]] = None
+        
+        # Завершение интервью с генерацией фидбэка (см. end_interview)
+        self._end_task: Optional[asyncio.Task] = None
+        
         # Статистика
         self.stats = {
             "total_questions": 0,
@@ -66,7 +142,7 @@ class InterviewCoordinator:
             "offtopic_redirects": 0
         }
         
-        logger.info(f"Координатор инициализирован. Имя: {participant_name}")
+        logger.info("Координатор инициализирован. Имя: %s", participant_name)
     
     async def start_interview(self, context: Dict[str, Any]) -> str:
         """
@@ -78,6 +154,16 @@ class InterviewCoordinator:
         Returns:
             Приветственное сообщение
         """
+        # Останавливаем незавершенную генерацию фидбэка прошлого интервью,
+        # чтобы она не записала результат в новую сессию
+        if self._end_task is not None and not self._end_task.done():
+            self._end_task.cancel()
+            try:
+                await self._end_task
+            except asyncio.CancelledError:
+                pass
+        self._end_task = None
+        
         # Инициализация
         self.memory.initialize_context(context)
         self.interviewer.set_interview_context(context)
@@ -103,7 +189,7 @@ class InterviewCoordinator:
                 internal_thoughts=f"[System]: Начало интервью для позиции {context.get('position')}"
             )
         
-        logger.info(f"Интервью начато. Контекст: {context}")
+        logger.info("Интервью начато. Контекст: %s", context)
         
         return greeting
     
@@ -127,31 +213,20 @@ class InterviewCoordinator:
             role="candidate"
         )
         
-        # Получаем контекст для анализа
-        relevant_context, general_context = self.memory.get_relevant_context(
-            self.current_topic or "общие вопросы"
-        )
+        # Последний вопрос интервьюера хранится в памяти, обход истории не нужен
+        last_question = self.memory.last_interviewer_message
         
-        # Получаем последний вопрос из истории диалога
-        last_question = ""
-        for turn in reversed(self.memory.dialogue_history):
-            if turn.get("speaker") == "interviewer":
-                last_question = turn.get("message", "")
-                break
-        
-        conversation_history = [
-            {"role": "assistant" if turn["speaker"] == "interviewer" else "user",
-             "content": turn["message"]}
-            for turn in general_context[-10:]
-        ]
+        # Последние ходы диалога уже хранятся в памяти в формате сообщений чата.
+        # Агенты только читают историю, а память меняется после их ответов,
+        # поэтому окно передается без копирования
+        conversation_history = self.memory.chat_window
         
-        # Создаем контекст для Observer
-        context_for_observer = {
-            **self.memory.interview_context,
+        # Создаем контекст для Observer (значения хода поверх контекста интервью, без копирования)
+        context_for_observer = ChainMap({
             "current_topic": self.current_topic or "общие вопросы",
             "current_difficulty": self.current_difficulty,
             "last_question": last_question
-        }
+        }, self.memory.interview_context)
         
         # Этап 1: Observer анализирует ответ
         logger.debug("Observer анализирует ответ...")
@@ -177,15 +252,14 @@ class InterviewCoordinator:
         )
         
         # Создаем контекст для Interviewer
-        context_for_interviewer = {
-            **self.memory.interview_context,
+        context_for_interviewer = ChainMap({
             "observer_recommendation": observer_result.get("recommendation", ""),
             "answer_quality": answer_quality,
             "is_good_answer": answer_quality >= 6,
             "current_topic": self.current_topic,
             "current_difficulty": self.current_difficulty,
             "last_question": last_question
-        }
+        }, self.memory.interview_context)
         
         # Этап 3: Interviewer генерирует ответ
         logger.debug("Interviewer генерирует ответ...")
@@ -244,8 +318,11 @@ class InterviewCoordinator:
             )
         
         # Проверяем завершение интервью
+        # Фидбэк (несколько запросов к LLM) собирается в фоне, чтобы ответ
+        # вернулся сразу; end_interview() дождется готового результата
         if self._should_end_interview(user_response):
-            await self.end_interview()
+            self.is_interview_active = False
+            self._end_task = asyncio.create_task(self._finish_interview())
             return interviewer_response + "\n\n[Интервью завершено. Генерирую фидбэк...]"
         
         return interviewer_response
@@ -255,59 +332,52 @@ class InterviewCoordinator:
     def _clean_final_response(self, response: str) -> str:
         """Финальная очистка ответа перед показом пользователю."""
         
-        # Удаляем все, что в квадратных скобках
-        import re
-        response = re.sub(r'\[.*?\]', '', response)
-        
-        # Удаляем все, что в звездочках
-        response = re.sub(r'\*.*?\*', '', response)
-        
-        # Удаляем подчеркивания
-        response = re.sub(r'_.*?_', '', response)
-        
-        # Удаляем разделители типа ---, ===
-        lines = response.split('\n')
-        clean_lines = []
-        
-        for line in lines:
-            line = line.strip()
+        # Быстрый путь: обычный ответ - одна строка без разметки,
+        # регулярка разметки и разбор по строкам ему не нужны
+        if not ('\n' in response or '[' in response or '*' in response or '_' in response):
+            response = response.strip()
+            if (not response or response.startswith(('---', '==='))
+                    or _RE_SKIP_KEYWORDS.search(response.lower())):
+                return ''
+        else:
+            # Удаляем все, что в квадратных скобках, звездочках и подчеркиваниях (за один проход)
+            response = _RE_MARKUP.sub('', response)
             
-            # Пропускаем пустые строки и разделители
-            if not line or line.startswith('---') or line.startswith('==='):
-                continue
+            # Удаляем разделители типа ---, ===
+            lines = response.split('\n')
+            clean_lines = []
             
-            # Пропускаем строки с техническими комментариями
-            if any(keyword in line.lower() for keyword in [
-                'следующий вопрос',
-                'предлагаю',
-                'рассмотрите',
-                'дополнительные аспекты',
-                'если кандидат'
-            ]):
-                continue
+            for line in lines:
+                line = line.strip()
+                
+                # Пропускаем пустые строки и разделители
+                if not line or line.startswith('---') or line.startswith('==='):
+                    continue
+                
+                # Пропускаем строки с техническими комментариями
+                if _RE_SKIP_KEYWORDS.search(line.lower()):
+                    continue
+                
+                clean_lines.append(line)
             
-            clean_lines.append(line)
-        
-        response = ' '.join(clean_lines)
+            response = ' '.join(clean_lines)
         
-        # Удаляем лишние пробелы
+        # Удаляем лишние пробелы (split/join быстрее регулярки по \s+);
+        # после этого краевых пробелов нет, повторный strip не нужен
         response = ' '.join(response.split())
         
-        # Капитализируем первую букву
+        # Капитализируем первую букву и убеждаемся, что это законченное предложение
         if response:
-            response = response[0].upper() + response[1:]
+            ending = '' if response.endswith(('.', '!', '?')) else '.'
+            response = response[0].upper() + response[1:] + ending
         
-        # Убедимся, что это законченное предложение
-        if response and not response.endswith(('.', '!', '?')):
-            response = response + '.'
-        
-        return response.strip()
+        return response
     
     async def _conduct_internal_dialogue(
         self,
         user_response: str,
         observer_result: Dict[str, Any],
-        conversation_history: List[Dict[str, str]]
+        conversation_history: Sequence[Dict[str, str]]
     ) -> str:
         """
         Проведение внутреннего диалога между агентами.
@@ -315,15 +385,13 @@ class InterviewCoordinator:
         Returns:
             Строка с внутренними мыслями для лога
         """
-        internal_messages = []
-        
-        # Мысли Observer
+        # Мысли Observer и его рекомендация Interviewer
         analysis = observer_result.get("analysis", "Анализ не проведен")[:500]
-        internal_messages.append(f"[Observer]: {analysis}...")
-        
-        # Observer отправляет рекомендацию Interviewer
         recommendation = observer_result.get("recommendation", "")
-        internal_messages.append(f"[Observer → Interviewer]: Рекомендация: {recommendation}")
+        observer_messages = (
+            f"[Observer]: {analysis}...\n"
+            f"[Observer → Interviewer]: Рекомендация: {recommendation}\n"
+        )
         
         # Interviewer анализирует рекомендацию
         interviewer_context = {
@@ -340,17 +408,21 @@ class InterviewCoordinator:
                 conversation_history=conversation_history
             )
             
-            internal_messages.append(f"[Interviewer]: {interviewer_thoughts['thoughts'][:500]}...")
+            thoughts = interviewer_thoughts['thoughts'][:500]
             
             # Решение о следующем действии
             action = interviewer_thoughts.get("action", "continue")
-            internal_messages.append(f"[Interviewer]: Решил выполнить действие: {action}")
             
         except Exception as e:
-            internal_messages.append(f"[Interviewer]: Произошла ошибка при анализе рекомендации")
-            logger.error(f"Ошибка в _conduct_internal_dialogue: {e}")
-        
-        return "\n".join(internal_messages)
+            logger.error("Ошибка в _conduct_internal_dialogue: %s", e)
+            return observer_messages + "[Interviewer]: Произошла ошибка при анализе рекомендации"
+        
+        # Строка собирается сразу, без промежуточного списка сообщений
+        return (
+            f"{observer_messages}"
+            f"[Interviewer]: {thoughts}...\n"
+            f"[Interviewer]: Решил выполнить действие: {action}"
+        )
     
     def _update_interview_state(
         self,
@@ -369,11 +441,10 @@ class InterviewCoordinator:
         
         self.stats["total_questions"] += 1
         
-        # Определяем, сменить ли тему
-        if self.stats["total_questions"] >= 10:
-            self.interview_phase = "closing"
-        elif self.stats["total_questions"] >= 5:
-            self.interview_phase = "deep_dive"
+        # Фаза меняется только на границах (счетчик растет на 1 за ход)
+        phase = _PHASE_AT_QUESTION.get(self.stats["total_questions"])
+        if phase is not None:
+            self.interview_phase = phase
         
         # Обновляем тему и сложность на основе качества ответа
         if self.current_topic:
@@ -386,43 +457,40 @@ class InterviewCoordinator:
             # Обновляем статистику темы в памяти
             if answer_quality >= 6:
                 # Хороший ответ - увеличиваем счетчик правильных ответов
-                if self.current_topic in self.memory.topics_covered:
-                    self.memory.topics_covered[self.current_topic]["correct_answers"] = \
-                        self.memory.topics_covered[self.current_topic].get("correct_answers", 0) + 1
+                topic_stats = self.memory.topics_covered.get(canonical_topic(self.current_topic))
+                if topic_stats is not None:
+                    topic_stats["correct_answers"] = topic_stats.get("correct_answers", 0) + 1
+    
+    @property
+    def current_difficulty(self) -> str:
+        """Текущий уровень сложности: junior, middle, senior."""
+        return _DIFFICULTY_LEVELS[self._difficulty_idx]
+    
+    @current_difficulty.setter
+    def current_difficulty(self, level: str) -> None:
+        self._difficulty_idx = _DIFFICULTY_INDEX[level]
     
     def _increase_difficulty(self):
         """Повышение сложности вопросов."""
-        difficulty_levels = ["junior", "middle", "senior"]
-        
-        if self.current_difficulty in difficulty_levels:
-            current_index = difficulty_levels.index(self.current_difficulty)
-            if current_index < len(difficulty_levels) - 1:
-                self.current_difficulty = difficulty_levels[current_index + 1]
-                logger.debug(f"Сложность повышена до {self.current_difficulty}")
+        if self._difficulty_idx < len(_DIFFICULTY_LEVELS) - 1:
+            self._difficulty_idx += 1
+            logger.debug("Сложность повышена до %s", self.current_difficulty)
     
     def _decrease_difficulty(self):
         """Понижение сложности вопросов."""
-        difficulty_levels = ["junior", "middle", "senior"]
-        
-        if self.current_difficulty in difficulty_levels:
-            current_index = difficulty_levels.index(self.current_difficulty)
-            if current_index > 0:
-                self.current_difficulty = difficulty_levels[current_index - 1]
-                logger.debug(f"Сложность понижена до {self.current_difficulty}")
+        if self._difficulty_idx > 0:
+            self._difficulty_idx -= 1
+            logger.debug("Сложность понижена до %s", self.current_difficulty)
     
     def _should_end_interview(self, user_response: str) -> bool:
         """Определение, следует ли завершить интервью."""
-        end_keywords = [
-            "стоп интервью", "завершить", "фидбэк", "конец",
-            "stop interview", "finish", "feedback", "завершите"
-        ]
-        
-        user_lower = user_response.lower()
-        return any(keyword in user_lower for keyword in end_keywords)
+        text = user_response.lower()
+        if any(phrase in text for phrase in _END_PHRASES):
+            return True
+        return not _END_TOKENS.isdisjoint(_RE_WORD.findall(text))
     
     def _clean_response_for_display(self, response: str) -> str:
         """Очистка ответа для отображения пользователю."""
-        import re
         
         # Удаляем сообщения об ошибках
         if "Отсутствует переменная" in response or "ошибка" in response.lower():
@@ -430,7 +498,7 @@ class InterviewCoordinator:
             return "Давайте продолжим интервью. Можете рассказать о вашем опыте?"
         
         # Удаляем технические сообщения в квадратных скобках
-        response = re.sub(r'\[.*?\]', '', response)
+        response = _RE_BRACKETS.sub('', response)
         
         # Удаляем примеры и инструкции
         lines = response.split('\n')
@@ -450,7 +518,18 @@ class InterviewCoordinator:
         return response.strip()
     
     async def end_interview(self) -> Dict[str, Any]:
-        """Завершение интервью и генерация фидбэка."""
+        """
+        Завершение интервью и генерация фидбэка.
+        
+        Если завершение уже запущено (кандидат попросил закончить интервью),
+        дожидается его результата вместо повторной генерации фидбэка.
+        """
+        if self._end_task is None:
+            self._end_task = asyncio.ensure_future(self._finish_interview())
+        return await self._end_task
+    
+    async def _finish_interview(self) -> Dict[str, Any]:
+        """Генерация фидбэка, запись в лог и закрытие ресурсов интервьюера."""
         self.is_interview_active = False
         
         # Генерируем фидбэк
@@ -468,7 +547,7 @@ class InterviewCoordinator:
             metadata={"feedback": feedback}
         )
         
-        logger.info(f"Интервью завершено. Всего вопросов: {self.stats['total_questions']}")
+        logger.info("Интервью завершено. Всего вопросов: %d", self.stats["total_questions"])
         
         return feedback
     
@@ -693,11 +772,11 @@ class InterviewCoordinator:
     async def _generate_general_recommendation(self, topic: str) -> str:
         """Генерация общей рекомендации по теме."""
         
+        cached = self._recommendation_cache.get(topic)
+        if cached is not None:
+            return cached
+        
         try:
-            from ..agents.interviewer import InterviewerAgent
-            
-            temp_interviewer = InterviewerAgent(name="Эксперт")
-            
             system_prompt = f"""Ты - технический эксперт и ментор. Объясни, как лучше всего изучить тему {topic}.
             
             Дай практические рекомендации по изучению этой темы. Включи:
@@ -710,15 +789,19 @@ class InterviewCoordinator:
             
             user_prompt = f"Как лучше всего изучить тему '{topic}' для junior-разработчика?"
             
-            recommendation = await temp_interviewer.llm_client.generate(
+            # Клиент интервьюера не хранит состояния диалога - отдельный агент не нужен
+            recommendation = await self.interviewer.llm_client.generate(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt
             )
             
+            # Заглушку при ошибке API не кэшируем
+            if recommendation != FALLBACK_RESPONSE:
+                self._recommendation_cache[topic] = recommendation.strip()
             return recommendation.strip()
             
         except Exception as e:
-            logger.error(f"Ошибка генерации рекомендации: {e}")
+            logger.error("Ошибка генерации рекомендации: %s", e)
             return f"Рекомендуем начать с основ {topic}: изучить документацию, пройти онлайн-курсы и решать практические задачи."
 
     async def generate_feedback(self) -> Dict[str, Any]:
@@ -728,10 +811,10 @@ class InterviewCoordinator:
         
         # Собираем данные для анализа
         qa_pairs = self.memory.qa_pairs
-        topics_stats = {
-            topic: self.memory.get_topic_performance(topic)
-            for topic in self.memory.topics_covered
-        }
+        
+        # Статистика тем ведется в памяти по ходу интервью (add_qa_pair),
+        # фидбэк только читает ее - копировать и пересчитывать не нужно
+        topics_stats = self.memory.topics_covered
         
         # А. Вердикт
         total_questions = self.stats["total_questions"]
@@ -742,19 +825,10 @@ class InterviewCoordinator:
         else:
             accuracy = correct_answers / total_questions
         
-        # Определяем уровень
-        if accuracy >= 0.8:
-            grade = "Senior"
-            hiring_recommendation = "Strong Hire"
-        elif accuracy >= 0.6:
-            grade = "Middle"
-            hiring_recommendation = "Hire"
-        elif accuracy >= 0.4:
-            grade = "Junior"
-            hiring_recommendation = "No Hire"
-        else:
-            grade = "Trainee"
-            hiring_recommendation = "No Hire"
+        # Определяем уровень по порогам точности
+        band = bisect_right(_ACCURACY_THRESHOLDS, accuracy)
+        grade = _GRADES[band]
+        hiring_recommendation = _HIRING_RECOMMENDATIONS[band]
         
         confidence_score = min(95, int(accuracy * 100))
         
@@ -762,100 +836,112 @@ class InterviewCoordinator:
         confirmed_skills = []
         knowledge_gaps = []
         
+        # Запросы к LLM для пробелов в знаниях (по одному на пробел) собираются
+        # здесь и выполняются одновременно после анализа тем
+        pending_answers = []
+        
+        # Один проход по qa_pairs вместо поиска для каждой темы: число вопросов
+        # и засчитанных ответов по теме, первый хороший ответ (пример навыка)
+        # и первый плохой ответ (пробел в знаниях)
+        topic_counts: Dict[str, List[int]] = {}
+        first_good: Dict[str, Dict[str, Any]] = {}
+        first_bad: Dict[str, Dict[str, Any]] = {}
+        for qa in qa_pairs:
+            topic = qa.get("topic", "общие вопросы")
+            evaluation = qa.get("evaluation") or _NO_EVALUATION
+            quality = evaluation.get("quality")
+            
+            counts = topic_counts.get(topic)
+            if counts is None:
+                counts = topic_counts[topic] = [0, 0]
+            counts[0] += 1
+            if evaluation.get("is_correct", False) or (quality or 0) >= 6:
+                counts[1] += 1
+            
+            # Ответ без оценки считается плохим (оценка по умолчанию - 5)
+            if quality is not None and quality >= 6:
+                first_good.setdefault(topic, qa)
+            else:
+                first_bad.setdefault(topic, qa)
+        
         # Сначала убедимся, что темы есть
         if not topics_stats:
             # Если статистики нет, создаем на основе qa_pairs
-            temp_topics = {}
-            for qa in qa_pairs:
-                topic = qa.get("topic", "общие вопросы")
-                if topic not in temp_topics:
-                    temp_topics[topic] = {"asked": 0, "correct": 0, "questions": []}
-                temp_topics[topic]["asked"] += 1
-                temp_topics[topic]["questions"].append(qa)
-                
-                eval_data = qa.get("evaluation", {})
-                if eval_data.get("is_correct", False) or eval_data.get("quality", 0) >= 6:
-                    temp_topics[topic]["correct"] += 1
-            
-            topics_stats = temp_topics
+            topics_stats = {
+                topic: {"asked": asked, "correct": correct}
+                for topic, (asked, correct) in topic_counts.items()
+            }
+        
+        # Темы с вопросами и их счетчики (вычисляются один раз для обоих проходов)
+        asked_topics = []
         
         # Теперь анализируем темы
         for topic, stats in topics_stats.items():
-            if not stats.get("asked", 0) and not stats.get("total_questions", 0):
+            asked = stats.get("asked") or stats.get("total_questions") or 0
+            if not asked:
                 continue
             
-            asked = stats.get("asked", 0) or stats.get("total_questions", 0)
-            correct = stats.get("correct", 0) or stats.get("correct_answers", 0)
+            correct = stats.get("correct") or stats.get("correct_answers") or 0
             
-            if asked == 0:
-                continue
+            # Ключ темы канонический (в нижнем регистре), в отчет идет исходное название
+            name = stats.get("name") or topic
+            asked_topics.append((name, asked, correct))
             
             accuracy_per_topic = correct / asked
             
             # Confirmed Skills: темы с точностью >= 60%
             if accuracy_per_topic >= 0.6:
-                # Находим пример правильного ответа
-                example_correct = None
-                for qa in qa_pairs:
-                    if qa.get("topic") == topic:
-                        evaluation = qa.get("evaluation", {})
-                        if evaluation.get("quality", 0) >= 6:
-                            example_correct = qa.get("question", "")
-                            break
+                # Пример правильного ответа
+                example = first_good.get(topic)
+                example_correct = example.get("question", "") if example is not None else None
                 
                 confirmed_skills.append({
-                    "topic": topic,
+                    "topic": name,
                     "accuracy": f"{int(accuracy_per_topic * 100)}%",
                     "total_questions": asked,
                     "correct_answers": correct,
-                    "example_question": example_correct or f"Вопросы по {topic}"
+                    "example_question": example_correct or f"Вопросы по {name}"
                 })
             
             # Knowledge Gaps: темы с точностью < 60%
             else:
-                # Находим вопросы, на которые кандидат ответил плохо
-                for qa in qa_pairs:
-                    if qa.get("topic") == topic:
-                        evaluation = qa.get("evaluation", {})
-                        quality = evaluation.get("quality", 5)
-                        
-                        if quality < 6:  # Плохой ответ
-                            # Генерируем правильный ответ
-                            correct_answer = await self._generate_correct_answer(
-                                question=qa.get("question", ""),
-                                candidate_answer=qa.get("answer", ""),
-                                topic=topic
-                            )
-                            
-                            knowledge_gaps.append({
-                                "topic": topic,
-                                "question": qa.get("question", ""),
-                                "candidate_answer": qa.get("answer", "")[:100] + "..." if qa.get("answer") else "Нет ответа",
-                                "correct_answer": correct_answer,
-                                "quality_score": f"{quality}/10",
-                                "suggested_resources": [
-                                    f"Документация по {topic}",
-                                    f"Практические задания по {topic}",
-                                    f"Курс 'Основы {topic}'"
-                                ]
-                            })
-                            break  # Берем только один вопрос на тему
+                # Берем только один вопрос на тему - первый плохой ответ
+                qa = first_bad.get(topic)
+                if qa is not None:
+                    quality = (qa.get("evaluation") or _NO_EVALUATION).get("quality", 5)
+                    
+                    # Правильный ответ сгенерируем вместе с остальными
+                    pending_answers.append(self._generate_correct_answer(
+                        question=qa.get("question", ""),
+                        candidate_answer=qa.get("answer", ""),
+                        topic=name
+                    ))
+                    
+                    knowledge_gaps.append({
+                        "topic": name,
+                        "question": qa.get("question", ""),
+                        "candidate_answer": qa.get("answer", "")[:100] + "..." if qa.get("answer") else "Нет ответа",
+                        "correct_answer": None,
+                        "quality_score": f"{quality}/10",
+                        "suggested_resources": [
+                            f"Документация по {name}",
+                            f"Практические задания по {name}",
+                            f"Курс 'Основы {name}'"
+                        ]
+                    })
         
         # Если все еще нет knowledge_gaps, но есть темы с низкой точностью
         if not knowledge_gaps:
-            for topic, stats in topics_stats.items():
-                asked = stats.get("asked", 0) or stats.get("total_questions", 0)
-                correct = stats.get("correct", 0) or stats.get("correct_answers", 0)
-                
+            for topic, asked, correct in asked_topics:
                 if asked > 0 and correct / asked < 0.6:
-                    # Генерируем общую рекомендацию
-                    correct_answer = await self._generate_general_recommendation(topic)
+                    # Общую рекомендацию сгенерируем вместе с остальными
+                    pending_answers.append(self._generate_general_recommendation(topic))
                     
                     knowledge_gaps.append({
                         "topic": topic,
                         "question": f"Общие вопросы по {topic}",
                         "candidate_answer": f"Правильных ответов: {correct} из {asked}",
-                        "correct_answer": correct_answer,
+                        "correct_answer": None,
                         "quality_score": f"{int(correct/asked*10) if asked>0 else 0}/10",
                         "suggested_resources": [
                             f"Основы {topic} для начинающих",
@@ -864,12 +950,21 @@ class InterviewCoordinator:
                         ]
                     })
         
+        # Все запросы к LLM - одной волной: время равно самому долгому запросу,
+        # а не сумме (семафор ограничивает число одновременных запросов)
+        if pending_answers:
+            semaphore = asyncio.Semaphore(_FEEDBACK_LLM_CONCURRENCY)
+            
+            async def limited(request):
+                async with semaphore:
+                    return await request
+            
+            answers = await asyncio.gather(*map(limited, pending_answers))
+            for gap, answer in zip(knowledge_gaps, answers):
+                gap["correct_answer"] = answer
+        
         # В. Анализ Soft Skills & Communication
-        soft_skills = {
-            "clarity": self._assess_clarity(),
-            "honesty": self._assess_honesty(),
-            "engagement": self._assess_engagement()
-        }
+        soft_skills = dict(self._assess_soft_skills())
         
         # Г. Персональный Roadmap (Next Steps) - ОБЯЗАТЕЛЬНО!
         roadmap = []
@@ -879,10 +974,7 @@ class InterviewCoordinator:
             topic = gap["topic"]
             
             # Определяем приоритет
-            if "python" in topic.lower() or "основ" in topic.lower() or "баз" in topic.lower():
-                priority = "высокий"
-            else:
-                priority = "средний"
+            priority = "высокий" if _RE_HIGH_PRIORITY.search(topic.lower()) else "средний"
             
             roadmap.append({
                 "priority": priority,
@@ -890,11 +982,7 @@ class InterviewCoordinator:
                 "action": f"Изучить основы {topic}",
                 "estimated_time": "2-3 недели",
                 "specific_task": f"Решить 5 практических задач по {topic}",
-                "resources": [
-                    f"Онлайн-курс по {topic}",
-                    f"Документация и руководства",
-                    f"Практические упражнения"
-                ]
+                "resources": [f"Онлайн-курс по {topic}", *_ROADMAP_STATIC_RESOURCES]
             })
         
         # Если roadmap пустой, создаем базовые рекомендации
@@ -907,11 +995,7 @@ class InterviewCoordinator:
                     "action": f"Освоить основы {topic}",
                     "estimated_time": "3-4 недели",
                     "specific_task": f"Пройти практический курс по {topic}",
-                    "resources": [
-                        f"Бесплатные курсы на Stepik/Coursera",
-                        f"Практические задания на LeetCode/HackerRank",
-                        f"Документация и книги по теме"
-                    ]
+                    "resources": list(_BASIC_ROADMAP_RESOURCES)
                 })
         
         # Формируем финальный фидбэк
@@ -925,8 +1009,8 @@ class InterviewCoordinator:
             "technical_review": {
                 "confirmed_skills": confirmed_skills,
                 "knowledge_gaps": knowledge_gaps,
-                "topics_covered": list(topics_stats.keys()),
-                "total_topics_asked": len([t for t in topics_stats if topics_stats[t].get("asked", False) or topics_stats[t].get("total_questions", 0) > 0])
+                "topics_covered": [stats.get("name") or topic for topic, stats in topics_stats.items()],
+                "total_topics_asked": len(asked_topics)
             },
             "soft_skills": soft_skills,
             "personal_roadmap": roadmap
@@ -1056,12 +1140,6 @@ class InterviewCoordinator:
         Использует LLM для создания объяснения.
         """
         try:
-            # Используем Interviewer для генерации правильного ответа
-            from ..agents.interviewer import InterviewerAgent
-            
-            # Создаем временного агента для генерации ответа
-            temp_interviewer = InterviewerAgent(name="Ответчик")
-            
             system_prompt = f"""Ты - технический эксперт. Тебе нужно объяснить правильный ответ на вопрос.
             
             Вопрос: {question}
@@ -1078,7 +1156,8 @@ class InterviewCoordinator:
             
             user_prompt = f"Сгенерируй правильный и понятный ответ на вопрос: '{question}'"
             
-            correct_answer = await temp_interviewer.llm_client.generate(
+            # Используем клиент Interviewer: временный агент на каждый пробел не нужен
+            correct_answer = await self.interviewer.llm_client.generate(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt
             )
@@ -1086,89 +1165,86 @@ class InterviewCoordinator:
             return correct_answer.strip()
             
         except Exception as e:
-            logger.error(f"Ошибка генерации правильного ответа: {e}")
+            logger.error("Ошибка генерации правильного ответа: %s", e)
             return f"Правильный ответ по теме {topic}. Для деталей изучите документацию и практические примеры."
     
-    def _assess_clarity(self) -> str:
-        """Оценка ясности изложения."""
-        # Упрощенная оценка
-        clarity_scores = []
-        for turn in self.memory.dialogue_history[-10:]:
-            if turn.get("speaker") == "candidate":
-                message = turn.get("message", "")
-                # Простые эвристики
-                if len(message.split()) > 50:
-                    clarity_scores.append(3)  # Детальный ответ
-                elif len(message.split()) > 20:
-                    clarity_scores.append(2)  # Нормальный ответ
-                else:
-                    clarity_scores.append(1)  # Короткий ответ
+    def _assess_soft_skills(self) -> Dict[str, str]:
+        """
+        Оценка soft skills за один проход по истории диалога.
+        
+        Результат кэшируется, пока не изменятся история диалога
+        или счетчик галлюцинаций.
         
+        Returns:
+            Словарь с оценками clarity, honesty, engagement
+        """
+        history = self.memory.dialogue_history
+        hallucinations = self.stats["hallucinations_detected"]
+        cache_key = (len(history), self.memory.last_update, hallucinations)
+        if self._soft_skills_cache is not None and self._soft_skills_cache[0] == cache_key:
+            return self._soft_skills_cache[1]
+        
+        # Ясность - по числу слов в ответах за последние ходы (память ведет его
+        # при добавлении хода): детальный, нормальный или короткий ответ
+        clarity_scores = [
+            3 if word_count > 50 else 2 if word_count > 20 else 1
+            for word_count in self.memory.recent_word_counts
+            if word_count is not None
+        ]
+        
+        # Встречные вопросы - по всей истории
+        counter_questions = 0
+        for turn in history:
+            if turn.get("speaker") == "candidate" and "?" in turn.get("message", ""):
+                counter_questions += 1
+        
+        # Ясность изложения
         if not clarity_scores:
-            return "Средняя"
+            clarity = "Средняя"
+        else:
+            avg_score = sum(clarity_scores) / len(clarity_scores)
+            if avg_score >= 2.5:
+                clarity = "Высокая"
+            elif avg_score >= 1.5:
+                clarity = "Средняя"
+            else:
+                clarity = "Низкая"
         
-        avg_score = sum(clarity_scores) / len(clarity_scores)
+        # Честность
+        if hallucinations > 2:
+            honesty = "Низкая"
+        elif hallucinations > 0:
+            honesty = "Средняя"
+        else:
+            honesty = "Высокая"
         
-        if avg_score >= 2.5:
-            return "Высокая"
-        elif avg_score >= 1.5:
-            return "Средняя"
+        # Вовлеченность
+        if counter_questions >= 3:
+            engagement = "Высокая"
+        elif counter_questions >= 1:
+            engagement = "Средняя"
         else:
-            return "Низкая"
+            engagement = "Низкая"
+        
+        skills = {"clarity": clarity, "honesty": honesty, "engagement": engagement}
+        self._soft_skills_cache = (cache_key, skills)
+        return skills
+    
+    def _assess_clarity(self) -> str:
+        """Оценка ясности изложения."""
+        return self._assess_soft_skills()["clarity"]
     
     def _assess_honesty(self) -> str:
         """Оценка честности."""
-        if self.stats["hallucinations_detected"] > 2:
-            return "Низкая"
-        elif self.stats["hallucinations_detected"] > 0:
-            return "Средняя"
-        else:
-            return "Высокая"
+        return self._assess_soft_skills()["honesty"]
     
     def _assess_engagement(self) -> str:
         """Оценка вовлеченности."""
-        # Считаем встречные вопросы
-        counter_questions = 0
-        for turn in self.memory.dialogue_history:
-            if turn.get("speaker") == "candidate" and "?" in turn.get("message", ""):
-                counter_questions += 1
-        
-        if counter_questions >= 3:
-            return "Высокая"
-        elif counter_questions >= 1:
-            return "Средняя"
-        else:
-            return "Низкая"
+        return self._assess_soft_skills()["engagement"]
     
     def _generate_summary_text(self, accuracy: float, grade: str) -> str:
         """Генерация текстового резюме."""
-        
-        if accuracy >= 0.8:
-            summary = (
-                f"Кандидат продемонстрировал отличные технические знания, соответствующие уровню {grade}. "
-                f"Ответы были точными, развернутыми и демонстрировали глубокое понимание тем. "
-                f"Рекомендуется к найму."
-            )
-        elif accuracy >= 0.6:
-            summary = (
-                f"Кандидат показал хорошие базовые знания на уровне {grade}. "
-                f"Есть понимание основных концепций, но требуются дополнительные знания в некоторых областях. "
-                f"Может рассматриваться на позицию с менторингом."
-            )
-        elif accuracy >= 0.4:
-            summary = (
-                f"Кандидат находится на уровне {grade}. "
-                f"Требуется дополнительное обучение и практика. "
-                f"Рекомендуется пройти стажировку или курсы повышения квалификации."
-            )
-        else:
-            summary = (
-                f"Кандидат показал низкий уровень знаний. "
-                f"Требуется фундаментальное обучение основам программирования. "
-                f"Не рекомендуется к найму на текущий момент."
-            )
-        
-        return summary
+        return _SUMMARY_TEMPLATES[bisect_right(_ACCURACY_THRESHOLDS, accuracy)].format(grade=grade)
     
     def save_session(self, filename: str = None) -> str:
         """Сохранение сессии интервью."""
@@ -1183,12 +1259,12 @@ class InterviewCoordinator:
         if self.json_logger:
             log_file = self.json_logger.save_to_file(filename)
             
-            # Также сохраняем в формате для сдачи
+            # Также сохраняем в формате для сдачи (копии уже записанного лога)
             submission_file = filename.replace(".json", "_submission.json")
-            self.json_logger.export_for_submission(submission_file)
+            self.json_logger.export_for_submission(submission_file, saved_path=log_file)
 
             # Сохраняем файл с именем interview_log.json в текущей директории
-            self.json_logger.export_for_submission("interview_log.json")
+            self.json_logger.export_for_submission("interview_log.json", saved_path=log_file)
             
             return log_file
         
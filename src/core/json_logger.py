@@ -5,7 +5,8 @@
 """
 
 import json
-from typing import Dict, Any, List
+import shutil
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 import uuid
@@ -182,6 +183,12 @@ class InterviewJSONLogger:
         }
         
         self.current_turn = 0
+        
+        # Версия лога (растет при каждом изменении) и выгрузки в файлы для сдачи:
+        # путь -> (версия, время изменения файла). Неизменившийся лог повторно
+        # не записывается, если файл с тех пор никто не перезаписал
+        self._revision = 0
+        self._exports: Dict[str, Tuple[int, int]] = {}
     
     def add_turn(
         self,
@@ -210,12 +217,14 @@ class InterviewJSONLogger:
         }
         
         self.log_data["turns"].append(turn_data)
+        self._revision += 1
         
         return self.current_turn
     
     def add_final_feedback(self, feedback: Dict[str, Any]) -> None:
         """Добавление финального фидбэка в лог."""
         self.log_data["final_feedback"] = feedback
+        self._revision += 1
     
     def save_to_file(self, filepath: str) -> str:
         """
@@ -230,21 +239,21 @@ class InterviewJSONLogger:
         # Создаем директорию если нужно
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
         
-        # Форматируем JSON согласно требованиям задания
-        formatted_json = json.dumps(self.log_data, ensure_ascii=False, indent=2)
-        
+        # Пишем JSON в файл по частям, не собирая весь лог в одну строку
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(formatted_json)
+            json.dump(self.log_data, f, ensure_ascii=False, indent=2)
         
         return filepath
     
-    def export_for_submission(self, filepath: str) -> str:
+    def export_for_submission(self, filepath: str, saved_path: Optional[str] = None) -> str:
         """
         Экспорт лога в формате для сдачи задания.
         Создает файл с именем interview_log.json
         
         Args:
             filepath: Путь для сохранения
+            saved_path: Файл, в который лог уже сохранен через save_to_file
+                (формат тот же, поэтому файл копируется без повторной сериализации)
             
         Returns:
             Путь к файлу
@@ -256,7 +265,26 @@ class InterviewJSONLogger:
             else:
                 filepath = filepath + "/interview_log.json"
         
-        return self.save_to_file(filepath)
+        # Лог не менялся с прошлой выгрузки в этот файл - запись не нужна
+        export = self._exports.get(filepath)
+        if export is not None and export[0] == self._revision:
+            try:
+                if Path(filepath).stat().st_mtime_ns == export[1]:
+                    return filepath
+            except OSError:
+                pass
+        
+        if saved_path is None:
+            self.save_to_file(filepath)
+        else:
+            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+            try:
+                shutil.copyfile(saved_path, filepath)
+            except shutil.SameFileError:
+                pass
+        
+        self._exports[filepath] = (self._revision, Path(filepath).stat().st_mtime_ns)
+        return filepath
     
     def get_log_summary(self) -> Dict[str, Any]:
         """Получение сводки лога."""
@@ -2,8 +2,11 @@
 Клиент для работы с Mistral API.
 """
 
+import asyncio
 import os
-from typing import Dict, Any, Optional, List
+import random
+import threading
+from typing import Dict, Any, Optional, List, Tuple
 from dotenv import load_dotenv
 import logging
 from mistralai import Mistral
@@ -13,6 +16,28 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Общие SDK-клиенты Mistral по API ключу: все агенты используют один пул HTTP-соединений
+_shared_sdk_clients: Dict[str, Mistral] = {}
+_shared_sdk_lock = threading.Lock()
+
+# Общие клиенты по параметрам генерации (модель, температура, лимит токенов)
+_shared_clients: Dict[Tuple[Optional[str], float, int], "MistralClient"] = {}
+
+# Повторы при превышении лимита запросов (HTTP 429)
+RATE_LIMIT_RETRIES = int(os.getenv("MISTRAL_RATE_LIMIT_RETRIES", "3"))
+RATE_LIMIT_BASE_DELAY = 0.5  # секунды, удваивается с каждой попыткой
+
+# Заглушка, которую generate возвращает при ошибке API
+FALLBACK_RESPONSE = "Продолжим интервью. Расскажите, пожалуйста, о вашем опыте работы с основными технологиями для этой позиции."
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Проверка, что ошибка SDK вызвана превышением лимита запросов."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "raw_response", None), "status_code", None)
+    return status == 429 or "429" in str(error)
+
 
 class MistralClient:
     """Клиент для работы с Mistral моделями через официальный API."""
@@ -23,6 +48,7 @@ class MistralClient:
         temperature: float = 0.7,
         max_tokens: int = 1000,
         api_key: Optional[str] = None,
+        sdk_client: Optional[Mistral] = None,
         **kwargs
     ):
         """
@@ -33,6 +59,7 @@ class MistralClient:
             temperature: Креативность (0-1)
             max_tokens: Максимальное количество токенов в ответе
             api_key: API ключ Mistral
+            sdk_client: Готовый SDK-клиент (если None, создается собственный)
         """
         self.temperature = temperature
         self.max_tokens = max_tokens
@@ -44,7 +71,7 @@ class MistralClient:
             raise ValueError("MISTRAL_API_KEY не найден в переменных окружения. Добавьте его в .env файл")
         
         # Инициализация клиента Mistral
-        self.client = Mistral(api_key=self.api_key)
+        self.client = sdk_client or Mistral(api_key=self.api_key)
         
         logger.info(f"Инициализирован Mistral клиент с моделью {model}")
     
@@ -80,20 +107,32 @@ class MistralClient:
                     else:
                         messages.append({"role": "assistant", "content": msg["content"]})
             
-            # Генерируем ответ
-            response = self.client.chat.complete(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
+            # Генерируем ответ (при 429 - повтор с экспоненциальной задержкой и джиттером).
+            # Асинхронный вызов не блокирует цикл событий: запросы разных сессий
+            # и агентов выполняются параллельно через общий пул соединений
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                try:
+                    response = await self.client.chat.complete_async(
+                        model=self.model,
+                        messages=messages,
+                        temperature=self.temperature,
+                        max_tokens=self.max_tokens
+                    )
+                    break
+                except Exception as e:
+                    if attempt == RATE_LIMIT_RETRIES or not _is_rate_limited(e):
+                        raise
+                    delay = RATE_LIMIT_BASE_DELAY * 2 ** attempt
+                    delay += random.uniform(0, delay)
+                    logger.warning(f"Превышен лимит запросов Mistral, повтор через {delay:.1f} с")
+                    await asyncio.sleep(delay)
             
             return response.choices[0].message.content.strip()
             
         except Exception as e:
             logger.error(f"Ошибка генерации Mistral: {e}")
             # Возвращаем заглушку для тестирования
-            return "Продолжим интервью. Расскажите, пожалуйста, о вашем опыте работы с основными технологиями для этой позиции."
+            return FALLBACK_RESPONSE
     
     def generate_sync(
         self,
@@ -104,7 +143,6 @@ class MistralClient:
         """
         Синхронная версия generate.
         """
-        import asyncio
         return asyncio.run(self.generate(system_prompt, user_prompt, history))
     
     async def generate_with_template(
@@ -150,6 +188,9 @@ class MistralClientFactory:
         """
         Создание Mistral клиента.
         
+        Клиенты с одним API ключом разделяют один SDK-клиент (и его пул соединений),
+        чтобы запросы разных агентов не тратили время на новые TCP/TLS соединения.
+        
         Args:
             model: Модель (если None, используется из окружения или дефолтная)
             **kwargs: Дополнительные параметры
@@ -160,10 +201,73 @@ class MistralClientFactory:
         if model is None:
             model = os.getenv("MISTRAL_MODEL", "mistral-large-latest")
         
+        api_key = kwargs.pop("api_key", None) or os.getenv("MISTRAL_API_KEY")
+        if api_key and "sdk_client" not in kwargs:
+            with _shared_sdk_lock:
+                sdk_client = _shared_sdk_clients.get(api_key)
+                if sdk_client is None:
+                    sdk_client = Mistral(api_key=api_key)
+                    _shared_sdk_clients[api_key] = sdk_client
+            kwargs["sdk_client"] = sdk_client
+        
         return MistralClient(
             model=model,
+            api_key=api_key,
             **kwargs
         )
+    
+    @staticmethod
+    def get_shared_client(
+        model: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> MistralClient:
+        """
+        Общий для процесса клиент с заданными параметрами генерации.
+        
+        Клиент не хранит состояния между запросами, поэтому агенты с одинаковыми
+        параметрами (например, Observer в разных сессиях) используют один экземпляр.
+        
+        Args:
+            model: Модель (если None, используется из окружения или дефолтная)
+            temperature: Креативность (0-1)
+            max_tokens: Максимальное количество токенов в ответе
+            
+        Returns:
+            Экземпляр MistralClient
+        """
+        key = (model, temperature, max_tokens)
+        with _shared_sdk_lock:
+            client = _shared_clients.get(key)
+        if client is None:
+            client = MistralClientFactory.create_client(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            with _shared_sdk_lock:
+                client = _shared_clients.setdefault(key, client)
+        return client
+    
+    @staticmethod
+    async def aclose_shared_clients() -> None:
+        """
+        Закрытие общих SDK-клиентов (при завершении работы приложения).
+        
+        Агенты работают через complete_async, поэтому асинхронный HTTP-клиент
+        закрывается через __aexit__ в том же цикле событий, где он использовался.
+        """
+        with _shared_sdk_lock:
+            clients = list(_shared_sdk_clients.values())
+            _shared_sdk_clients.clear()
+            _shared_clients.clear()
+        
+        for sdk_client in clients:
+            try:
+                await sdk_client.__aexit__(None, None, None)
+                sdk_client.__exit__(None, None, None)
+            except Exception as e:
+                logger.error(f"Ошибка закрытия клиента Mistral: {e}")
 
 
 # Тестирование клиента
@@ -195,8 +299,6 @@ async def test_mistral_client():
 
 
 if __name__ == "__main__":
-    import asyncio
-    
     # Быстрый тест
     result = asyncio.run(test_mistral_client())
     if result:
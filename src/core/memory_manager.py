@@ -5,16 +5,34 @@
 """
 
 import json
-from typing import Dict, List, Any, Optional, Tuple
+import sys
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 import numpy as np
 from pathlib import Path
 
 
+def canonical_topic(topic: str) -> str:
+    """
+    Каноническое имя темы: без краевых пробелов, в нижнем регистре, интернированное.
+    
+    Варианты одной темы ("Python", "python ") попадают в одну запись статистики,
+    а ключи словарей сравниваются по ссылке. Исходное написание для вывода
+    хранится в поле "name" записи статистики.
+    """
+    return sys.intern(topic.strip().lower())
+
+
 class InterviewMemory:
     """Продвинутая система памяти для хранения контекста интервью."""
     
+    # Количество последних ходов, передаваемых агентам как история чата
+    CHAT_WINDOW_SIZE = 10
+    
+    # Количество последних ходов, по которым оценивается ясность ответов кандидата
+    WORD_COUNT_WINDOW_SIZE = 10
+    
     def __init__(self, max_history_length: int = 50):
         """
         Инициализация системы памяти.
@@ -27,6 +45,15 @@ class InterviewMemory:
         # Основная история диалога
         self.dialogue_history: List[Dict[str, Any]] = []
         
+        # Последнее сообщение интервьюера (обновляется при добавлении хода)
+        self.last_interviewer_message: str = ""
+        
+        # Последние ходы в формате сообщений чата {"role", "content"} для агентов
+        self.chat_window: Deque[Dict[str, str]] = deque(maxlen=self._chat_window_size())
+        
+        # Число слов в ответах кандидата за последние ходы истории (None - ход не кандидата)
+        self.recent_word_counts: Deque[Optional[int]] = deque(maxlen=self._recent_window_size())
+        
         # Контекст интервью (позиция, грейд, опыт)
         self.interview_context: Dict[str, Any] = {}
         
@@ -49,7 +76,8 @@ class InterviewMemory:
         # Инициализируем темы на основе технологий
         technologies = context.get("technologies", [])
         for tech in technologies:
-            self.topics_covered[tech] = {
+            self.topics_covered[canonical_topic(tech)] = {
+                "name": tech.strip(),
                 "asked": False,
                 "correct_answers": 0,
                 "total_questions": 0,
@@ -87,12 +115,35 @@ class InterviewMemory:
         
         self.dialogue_history.append(turn)
         
+        if speaker == "interviewer":
+            self.last_interviewer_message = message
+        self.chat_window.append(self._chat_message(speaker, message))
+        self.recent_word_counts.append(self._word_count(speaker, message))
+        
         # Ограничиваем длину истории
         if len(self.dialogue_history) > self.max_history_length:
             self.dialogue_history = self.dialogue_history[-self.max_history_length:]
         
         self.last_update = datetime.now()
 
+    @staticmethod
+    def _chat_message(speaker: str, message: str) -> Dict[str, str]:
+        """Ход диалога в формате сообщения чата для LLM."""
+        return {"role": "assistant" if speaker == "interviewer" else "user", "content": message}
+
+    @staticmethod
+    def _word_count(speaker: str, message: str) -> Optional[int]:
+        """Число слов в ответе кандидата (None для остальных участников)."""
+        return len(message.split()) if speaker == "candidate" else None
+
+    def _chat_window_size(self) -> int:
+        """Размер окна chat_window: последние ходы, но не больше хранимой истории."""
+        return min(self.CHAT_WINDOW_SIZE, self.max_history_length)
+    
+    def _recent_window_size(self) -> int:
+        """Размер окна recent_word_counts: последние ходы, но не больше хранимой истории."""
+        return min(self.WORD_COUNT_WINDOW_SIZE, self.max_history_length)
+
     def add_qa_pair(
         self,
         question: str,
@@ -102,11 +153,14 @@ class InterviewMemory:
         evaluation: Optional[Dict[str, Any]] = None
     ) -> None:
         """Добавление пары вопрос-ответ с оценкой."""
+        topic_name = topic.strip() if topic else None
+        if topic:
+            topic = canonical_topic(topic)
         
         qa_pair = {
             "question": question,
             "answer": answer,
-            "topic": topic or self._extract_topic(question),
+            "topic": topic or canonical_topic(self._extract_topic(question)),
             "difficulty": difficulty,
             "evaluation": evaluation or {},
             "timestamp": datetime.now().isoformat(),
@@ -119,6 +173,7 @@ class InterviewMemory:
         if topic:
             if topic not in self.topics_covered:
                 self.topics_covered[topic] = {
+                    "name": topic_name,
                     "asked": True,
                     "correct_answers": 0,
                     "total_questions": 1,
@@ -183,6 +238,7 @@ class InterviewMemory:
         Returns:
             Новая сложность
         """
+        topic = canonical_topic(topic)
         if topic not in self.topics_covered:
             return "junior"
         
@@ -274,6 +330,7 @@ class InterviewMemory:
     
     def get_topic_performance(self, topic: str) -> Dict[str, Any]:
         """Получение статистики по теме."""
+        topic = canonical_topic(topic)
         if topic not in self.topics_covered:
             return {
                 "asked": False,
@@ -326,14 +383,30 @@ class InterviewMemory:
         
         return {
             "total_questions": total_questions,
-            "topics_covered": list(self.topics_covered.keys()),
-            "topics_asked": [t for t, s in self.topics_covered.items() if s.get("asked", False)],
+            "topics_covered": [s.get("name") or t for t, s in self.topics_covered.items()],
+            "topics_asked": [s.get("name") or t for t, s in self.topics_covered.items() if s.get("asked", False)],
             "average_accuracy": round(avg_accuracy, 2),
             "duration_minutes": round(duration_minutes, 1),
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "last_update": self.last_update.isoformat() if self.last_update else None
         }
     
+    def _merge_topic_stats(self, topic: str, stats: Dict[str, Any]) -> None:
+        """Добавление загруженной статистики темы под каноническим ключом со слиянием дубликатов."""
+        key = canonical_topic(topic)
+        existing = self.topics_covered.get(key)
+        if existing is None:
+            merged = dict(stats)
+            merged.setdefault("name", topic.strip())
+            self.topics_covered[key] = merged
+            return
+        
+        existing["asked"] = existing.get("asked", False) or stats.get("asked", False)
+        existing["total_questions"] = existing.get("total_questions", 0) + stats.get("total_questions", 0)
+        existing["correct_answers"] = existing.get("correct_answers", 0) + stats.get("correct_answers", 0)
+        if stats.get("last_question"):
+            existing["last_question"] = stats["last_question"]
+    
     def _extract_topic(self, text: str) -> str:
         """Извлечение темы из текста."""
         # Простая эвристика для извлечения темы
@@ -404,12 +477,32 @@ class InterviewMemory:
             
             self.interview_context = data.get("interview_context", {})
             self.dialogue_history = data.get("dialogue_history", [])
+            self.last_interviewer_message = next(
+                (turn.get("message", "") for turn in reversed(self.dialogue_history)
+                 if turn.get("speaker") == "interviewer"),
+                ""
+            )
+            self.chat_window = deque(
+                (self._chat_message(turn["speaker"], turn["message"])
+                 for turn in self.dialogue_history[-self._chat_window_size():]),
+                maxlen=self._chat_window_size()
+            )
+            self.recent_word_counts = deque(
+                (self._word_count(turn.get("speaker"), turn.get("message", ""))
+                 for turn in self.dialogue_history[-self._recent_window_size():]),
+                maxlen=self._recent_window_size()
+            )
             
-            # Восстанавливаем defaultdict
-            topics_data = data.get("topics_covered", {})
-            self.topics_covered = defaultdict(dict, topics_data)
+            # Восстанавливаем defaultdict с каноническими ключами тем
+            # (в старых файлах варианты одной темы могли храниться отдельно)
+            self.topics_covered = defaultdict(dict)
+            for topic, stats in data.get("topics_covered", {}).items():
+                self._merge_topic_stats(topic, stats)
             
             self.qa_pairs = data.get("qa_pairs", [])
+            for qa in self.qa_pairs:
+                if qa.get("topic"):
+                    qa["topic"] = canonical_topic(qa["topic"])
             
             # Восстанавливаем даты
             if data.get("start_time"):
@@ -15,6 +15,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from dotenv import load_dotenv
 from src.core.coordinator import InterviewCoordinator
+from src.core.llm_client import MistralClientFactory
 from src.utils.logger import setup_logging
 
 # Загрузка переменных окружения
@@ -417,6 +418,14 @@ async def run_scenario_mode(scenario_file: str = None):
     }
 
 
+async def _run_mode(mode) -> None:
+    """Запуск режима с закрытием общих HTTP-соединений с Mistral API в том же цикле событий."""
+    try:
+        await mode
+    finally:
+        await MistralClientFactory.aclose_shared_clients()
+
+
 def main():
     """Главная функция."""
     
@@ -434,13 +443,13 @@ def main():
     choice = input("\nВаш выбор (1-3): ").strip()
     
     if choice == "1":
-        asyncio.run(run_interactive_mode())
+        asyncio.run(_run_mode(run_interactive_mode()))
     elif choice == "2":
-        asyncio.run(run_scenario_mode())
+        asyncio.run(_run_mode(run_scenario_mode()))
     elif choice == "3":
         filepath = input("Путь к файлу сценария: ").strip()
         if os.path.exists(filepath):
-            asyncio.run(run_scenario_mode(filepath))
+            asyncio.run(_run_mode(run_scenario_mode(filepath)))
         else:
             print(f"❌ Файл не найден: {filepath}")
     else: